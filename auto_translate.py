@@ -4,15 +4,54 @@ Auto-Translation Helper for BookletPDF App
 Automatically adds missing translations with intelligent defaults
 """
 
-import json
 from pathlib import Path
-from typing import Dict, List
-import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+import os
+import sys
+import json
+import argparse
+
+from xcstrings_stream import Catalog, XCStringsReader, update_catalog
+from localization_validators import iter_string_units
+from localization_profiler import PhaseProfiler, write_profile
+from phrase_matcher import PhraseMatcher
+from translation_memory import DEFAULT_MEMORY_PATH, TranslationMemory, load_or_build
+from translation_backends import DEFAULT_CACHE_PATH, HttpBackend, OfflineBackend, TranslationBackend
+from source_fingerprints import SourceFingerprints, fingerprints_path_for
+
+DEFAULT_LOCALIZABLE_PATH = "/Users/muhammad/Development/Personal/Startups/booklet/bookletpdf/bookletPdf/Utils/Resources/Localizable.xcstrings"
+# Distinct English strings whose translations are remembered
+TRANSLATION_CACHE_SIZE = 4096
+# Punctuation dropped before the word-by-word translation
+_STRIPPED_PUNCTUATION = str.maketrans('', '', ':?!')
+# Languages fill_missing_languages can produce, uz-UZ as a copy of uz
+RETRANSLATED_LANGUAGES = ('de', 'fr', 'uz', 'uz-UZ')
+
+def _retranslatable(key: str, english_value: Optional[str], lang: str, localization: Dict) -> bool:
+    """Whether fill_missing_languages would recreate this localization if it were removed"""
+    return (key.startswith('str.') and bool(english_value) and lang in RETRANSLATED_LANGUAGES
+            and 'stringUnit' in localization and 'variations' not in localization)
 
 class AutoTranslator:
-    def __init__(self, localizable_path: str):
+    def __init__(self, localizable_path: str, profiler: Optional[PhaseProfiler] = None,
+                 cache_size: int = TRANSLATION_CACHE_SIZE):
         self.localizable_path = Path(localizable_path)
+        self.profiler = profiler or PhaseProfiler(enabled=False)
         self.translations = {}
+        self.updated_count = 0
+        self.memory: Optional[TranslationMemory] = None
+        self.min_similarity = 0.75
+        self.memory_matches = 0
+        # Without a backend the built-in dictionaries translate each string directly
+        self.backend: Optional[TranslationBackend] = None
+        self.prefetched = {}
+        # Translations made from an older English text are retranslated when there are fingerprints
+        self.fingerprints: Optional[SourceFingerprints] = None
+        self.stale_values = {}
+        self.stale_count = 0
+        self.retranslated_count = 0
+        self.edited_count = 0
         
         # Translation dictionaries for common terms
         self.term_translations = {
@@ -81,18 +120,51 @@ class AutoTranslator:
             r'error calculating': {'de': 'Fehler bei der Berechnung', 'fr': 'Erreur de calcul', 'uz': 'Hisoblashda xato'},
             r'not available': {'de': 'nicht verfügbar', 'fr': 'non disponible', 'uz': 'mavjud emas'},
         }
+        
+        self._cached_translate = lru_cache(maxsize=cache_size)(self._translate)
+        self.compile_tables()
+    
+    def compile_tables(self):
+        """Rebuild the phrase matcher and forget memoized results; call after changing the tables"""
+        self._phrase_matcher = PhraseMatcher(list(self.phrase_patterns))
+        self._phrase_translations = list(self.phrase_patterns.values())
+        self._cached_translate.cache_clear()
     
-    def load_localizations(self) -> Dict:
-        """Load current localizations"""
+    def load_glossary(self, glossary_path: str):
+        """Merge an external glossary into the term and phrase tables
+        
+        The file is JSON shaped like {"terms": {word: {lang: text}}, "phrases": {pattern: {lang: text}}}.
+        Terms replace built-in ones; phrases rank after those already loaded and
+        are regular expressions searched as with re.search. Languages a term
+        leaves out keep the English word. Raises ValueError for an invalid
+        phrase pattern, leaving the tables unchanged.
+        """
+        with open(glossary_path, 'r', encoding='utf-8') as f:
+            glossary = json.load(f)
+        phrase_patterns = dict(self.phrase_patterns)
+        for pattern, translations in glossary.get('phrases', {}).items():
+            phrase_patterns.setdefault(pattern, translations)
         try:
-            with open(self.localizable_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"❌ Error loading localizations: {e}")
-            return {}
+            PhraseMatcher(list(phrase_patterns))
+        except ValueError as e:
+            raise ValueError(f"{glossary_path}: {e}") from e
+        self.term_translations.update({term.lower(): translations
+                                       for term, translations in glossary.get('terms', {}).items()})
+        self.phrase_patterns = phrase_patterns
+        self.compile_tables()
+        print(f"📚 Loaded {len(glossary.get('terms', {}))} terms and "
+              f"{len(glossary.get('phrases', {}))} phrases from {glossary_path}")
     
     def intelligent_translate(self, key: str, english_value: str) -> Dict[str, str]:
-        """Generate intelligent translations based on patterns and dictionaries"""
+        """Generate intelligent translations based on patterns and dictionaries
+        
+        Results depend only on the English value, so they are memoized per value;
+        each call gets its own copy.
+        """
+        return dict(self._cached_translate(english_value))
+    
+    def _translate(self, english_value: str) -> Dict[str, str]:
+        """Translate one English value through the term table, the phrase matcher and word by word"""
         translations = {'de': '', 'fr': '', 'uz': ''}
         
         # Clean the English value
@@ -102,19 +174,20 @@ class AutoTranslator:
         if english_lower in self.term_translations:
             return self.term_translations[english_lower]
         
-        # Try phrase pattern matching
-        for pattern, trans in self.phrase_patterns.items():
-            if re.search(pattern, english_lower):
-                return trans
+        # Try phrase pattern matching, first pattern in table order wins
+        phrase_index = self._phrase_matcher.first_match(english_lower)
+        if phrase_index is not None:
+            return self._phrase_translations[phrase_index]
         
         # Try word-by-word translation for compound phrases
-        words = english_lower.replace(':', '').replace('?', '').replace('!', '').split()
+        words = english_lower.translate(_STRIPPED_PUNCTUATION).split()
         translated_words = {'de': [], 'fr': [], 'uz': []}
         
         for word in words:
             if word in self.term_translations:
                 for lang in ['de', 'fr', 'uz']:
-                    translated_words[lang].append(self.term_translations[word][lang])
+                    # Glossary terms may leave a language out
+                    translated_words[lang].append(self.term_translations[word].get(lang) or word.capitalize())
             else:
                 # Keep unknown words as-is but capitalized appropriately
                 for lang in ['de', 'fr', 'uz']:
@@ -125,8 +198,7 @@ class AutoTranslator:
             if translated_words[lang]:
                 translations[lang] = ' '.join(translated_words[lang])
             else:
-                # Fallback: use the key name as a hint
-                key_hint = key.replace('str.', '').replace('_', ' ').title()
+                # Fallback: mark the untranslated English value
                 translations[lang] = f"[{lang.upper()}] {english_value}"
         
         # Preserve punctuation
@@ -149,76 +221,259 @@ class AutoTranslator:
         
         return translations
     
-    def add_missing_translations(self) -> bool:
-        """Add missing translations to the localizations data"""
-        data = self.load_localizations()
-        if not data:
-            return False
+    def fill_missing_languages(self, key: str, entry: Dict) -> Optional[Dict]:
+        """Add missing translations to a single catalog entry; returns None when nothing was added"""
+        if not key.startswith('str.'):
+            return None
         
-        strings_data = data.get('strings', {})
-        updated_count = 0
+        localizations = entry.get('localizations', {})
         
-        for key, entry in strings_data.items():
-            if not key.startswith('str.'):
+        # Get English value as base for translation
+        english_entry = localizations.get('en', {}).get('stringUnit', {})
+        english_value = english_entry.get('value', '')
+        
+        if not english_value:
+            return None
+        
+        # Get intelligent translations, fetched from the backend in batches beforehand when there is one
+        smart_translations = self.prefetched.get(english_value)
+        if smart_translations is None:
+            with self.profiler.accumulate('intelligent_translate'):
+                smart_translations = self.intelligent_translate(key, english_value)
+        
+        # Add missing translations
+        needs_update = False
+        for lang in ['de', 'fr', 'uz']:
+            if lang not in localizations and lang in smart_translations:
+                value, state = smart_translations[lang], "translated"
+                match = self.memory.best_match(english_value, lang, self.min_similarity) if self.memory else None
+                # The memory may still hold the stale translation paired with the new English text
+                if match and match[1] != self.stale_values.get((key, lang)):
+                    score, value = match
+                    # Anything short of the same source string needs a human look
+                    state = "translated" if score == 1.0 else "needs_review"
+                    self.memory_matches += 1
+                localizations[lang] = {
+                    "stringUnit": {
+                        "state": state,
+                        "value": value
+                    }
+                }
+                needs_update = True
+        
+        # Handle uz-UZ variant (copy from uz)
+        if 'uz-UZ' not in localizations and 'uz' in localizations:
+            localizations['uz-UZ'] = localizations['uz']
+            needs_update = True
+        
+        if not needs_update:
+            return None
+        self.updated_count += 1
+        return entry
+    
+    def retire_stale(self, key: str, entry: Dict) -> Dict[str, Optional[Dict]]:
+        """Mark translations made from an older English text needs_review; returns language -> removed localization
+        
+        Stale localizations fill_missing_languages can recreate are removed so
+        they get translated again from the current English value. The others,
+        and translations a person edited along with the English text, keep
+        their value (None in the result).
+        """
+        stale = {}
+        localizations = entry.get('localizations', {})
+        english_value = localizations.get('en', {}).get('stringUnit', {}).get('value')
+        outdated, edited = self.fingerprints.stale_languages(key, entry)
+        self.edited_count += len(edited)
+        for lang in outdated + edited:
+            localization = localizations[lang]
+            for _, unit in iter_string_units(localization):
+                unit['state'] = 'needs_review'
+            if lang in outdated and _retranslatable(key, english_value, lang, localization):
+                self.stale_values[(key, lang)] = localization['stringUnit'].get('value')
+                stale[lang] = localizations.pop(lang)
+            else:
+                stale[lang] = None
+        self.stale_count += len(stale)
+        return stale
+    
+    def fill_entry(self, key: str, entry: Dict) -> Optional[Dict]:
+        """Retranslate the stale languages of one entry, add its missing ones and record their source text"""
+        if self.fingerprints is None:
+            return self.fill_missing_languages(key, entry)
+        stale = self.retire_stale(key, entry)
+        filled = self.fill_missing_languages(key, entry) is not None
+        localizations = entry.get('localizations', {})
+        for lang, removed in stale.items():
+            if removed is None:
                 continue
-            
+            unit = localizations.get(lang, {}).get('stringUnit')
+            if unit is None:
+                localizations[lang] = removed
+            else:
+                # A fresh unit: fill_missing_languages shares the uz one with uz-UZ
+                localizations[lang] = {"stringUnit": dict(unit, state="needs_review")}
+                self.retranslated_count += 1
+        self.fingerprints.track(key, entry)
+        return entry if stale or filled else None
+    
+    def collect_untranslated(self, entries: Optional[Iterable[Tuple[str, Dict]]] = None) -> List[str]:
+        """Return the English values of keys that lack a de, fr or uz translation or have a stale one"""
+        values = []
+        if entries is None:
+            entries = XCStringsReader(self.localizable_path).entries()
+        for key, entry in entries:
             localizations = entry.get('localizations', {})
-            
-            # Get English value as base for translation
-            english_entry = localizations.get('en', {}).get('stringUnit', {})
-            english_value = english_entry.get('value', '')
-            
-            if not english_value:
+            english_value = localizations.get('en', {}).get('stringUnit', {}).get('value')
+            if not key.startswith('str.') or not english_value:
                 continue
-            
-            # Get intelligent translations
-            smart_translations = self.intelligent_translate(key, english_value)
-            
-            # Add missing translations
-            needs_update = False
-            for lang in ['de', 'fr', 'uz']:
-                if lang not in localizations and lang in smart_translations:
-                    localizations[lang] = {
-                        "stringUnit": {
-                            "state": "translated",
-                            "value": smart_translations[lang]
-                        }
-                    }
-                    needs_update = True
-            
-            # Handle uz-UZ variant (copy from uz)
-            if 'uz-UZ' not in localizations and 'uz' in localizations:
-                localizations['uz-UZ'] = localizations['uz']
-                needs_update = True
-            
-            if needs_update:
-                updated_count += 1
+            stale = self.fingerprints.stale_languages(key, entry)[0] if self.fingerprints else ()
+            if (not {'de', 'fr', 'uz'} <= localizations.keys()
+                    or any(_retranslatable(key, english_value, lang, localizations[lang]) for lang in stale)):
+                values.append(english_value)
+        return values
+    
+    def prefetch(self, entries: Optional[Iterable[Tuple[str, Dict]]] = None):
+        """Translate every untranslated string through the backend in batches, if there is one"""
+        if not self.backend:
+            return
+        with self.profiler.phase('backend_translate'):
+            texts = self.collect_untranslated(entries)
+            self.prefetched = self.backend.translate_all(texts, ['de', 'fr', 'uz'])
+        stats = self.backend.stats
+        print(f"🌐 {self.backend.name}: {stats['unique']} unique strings, {stats['cache_hits']} cached, "
+              f"{stats['batches']} batches, {stats['retries']} retries, {stats['fallback']} from the offline fallback")
+    
+    def _reset_counts(self):
+        self.updated_count = 0
+        self.memory_matches = 0
+        self.stale_values = {}
+        self.stale_count = 0
+        self.retranslated_count = 0
+        self.edited_count = 0
+    
+    def print_stale_summary(self):
+        if self.stale_count:
+            print(f"🕰️  {self.stale_count} translations were made from an older English text: "
+                  f"{self.retranslated_count} retranslated, {self.edited_count} kept as edited along with it, "
+                  f"all marked needs_review")
+    
+    def fill_catalog(self, catalog: Catalog) -> int:
+        """Add missing and retranslate stale translations of an already loaded catalog in memory
+        
+        Returns the keys updated. The fingerprints are left for the caller to
+        save together with the catalog.
+        """
+        self._reset_counts()
+        self.prefetch(catalog.items())
+        with self.profiler.phase('fill_missing_languages'):
+            for key, entry in list(catalog.items()):
+                if self.fill_entry(key, entry) is not None:
+                    catalog.mark_changed(key)
+        if self.fingerprints is not None:
+            self.fingerprints.prune(set(catalog.entries) | set(catalog.added))
+        return self.updated_count
+    
+    def add_missing_translations(self) -> bool:
+        """Add missing and retranslate stale translations, re-encoding only the entries that changed"""
+        self._reset_counts()
+        seen_keys = set()
+        
+        def transform(key: str, entry: Dict) -> Optional[Dict]:
+            seen_keys.add(key)
+            return self.fill_entry(key, entry)
         
-        # Save updated data
         try:
-            with open(self.localizable_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            print(f"✅ Updated {updated_count} keys with missing translations")
+            self.prefetch()
+            with self.profiler.phase('update_catalog') as phase:
+                update_catalog(self.localizable_path, transform, profiler=self.profiler)
+                phase.add(bytes=self.localizable_path.stat().st_size, files=1)
+            if self.updated_count:
+                print(f"✅ Updated {self.updated_count} keys with missing translations")
+            else:
+                print("✅ No missing translations, catalog left untouched")
+            self.print_stale_summary()
+            if self.memory:
+                print(f"🧠 {self.memory_matches} translations reused from the translation memory")
+            if self.fingerprints is not None:
+                self.fingerprints.prune(seen_keys)
+                if self.fingerprints.save():
+                    print(f"🔏 Source fingerprints saved to {self.fingerprints.path}")
             return True
         except Exception as e:
-            print(f"❌ Error saving translations: {e}")
+            print(f"❌ Error updating translations: {e}")
             return False
     
     def run(self):
         """Run the auto-translation process"""
         print("🤖 Starting Auto-Translation...")
         
-        if self.add_missing_translations():
+        with self.profiler.phase('auto_translate'):
+            succeeded = self.add_missing_translations()
+        if succeeded:
             print("🎉 Auto-translation completed successfully!")
             print("📝 Review the generated translations and improve them as needed")
         else:
             print("❌ Auto-translation failed")
 
+def add_translation_arguments(parser: argparse.ArgumentParser):
+    """Add the glossary, translation memory and backend options to a command line parser"""
+    parser.add_argument('-g', '--glossary', action='append', default=[], metavar='PATH',
+                        help="JSON glossary with extra terms and phrases (can be repeated)")
+    parser.add_argument('-m', '--memory', nargs='?', const=DEFAULT_MEMORY_PATH, metavar='PATH',
+                        help=f"Reuse existing translations through a fuzzy translation memory (default: {DEFAULT_MEMORY_PATH})")
+    parser.add_argument('--min-similarity', type=float, default=0.75,
+                        help="Minimum similarity for a translation memory match; inexact matches are marked needs_review")
+    parser.add_argument('--backend-url', metavar='URL',
+                        help="Translation service to use (API key from TRANSLATION_API_KEY); "
+                             "the built-in dictionaries are the fallback")
+    parser.add_argument('--batch-size', type=int, default=50, help="Strings per backend request")
+    parser.add_argument('--concurrency', type=int, default=4, help="Backend requests in flight")
+    parser.add_argument('--backend-cache', default=DEFAULT_CACHE_PATH, metavar='PATH',
+                        help=f"Disk cache for backend responses (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--fingerprints', metavar='PATH',
+                        help="Source fingerprints used to retranslate strings whose English text changed "
+                             "(default: .<catalog name>.fingerprints.json next to the catalog)")
+    parser.add_argument('--no-fingerprints', action='store_true',
+                        help="Only add missing translations, without tracking English source changes")
+
+def configure_translator(translator: AutoTranslator, args: argparse.Namespace,
+                         entries: Optional[Iterable[Tuple[str, Dict]]] = None):
+    """Apply the options of add_translation_arguments; entries are the catalog's, when already parsed"""
+    for glossary_path in args.glossary:
+        translator.load_glossary(glossary_path)
+    if not args.no_fingerprints:
+        translator.fingerprints = SourceFingerprints.load(
+            args.fingerprints or fingerprints_path_for(translator.localizable_path))
+    if args.memory:
+        translator.memory = load_or_build(translator.localizable_path, Path(args.memory), entries=entries)
+        translator.min_similarity = args.min_similarity
+    if args.backend_url:
+        translator.backend = HttpBackend(args.backend_url, api_key=os.environ.get('TRANSLATION_API_KEY'),
+                                         fallback=OfflineBackend(translator), batch_size=args.batch_size,
+                                         concurrency=args.concurrency, cache_path=args.backend_cache)
+
 def main():
-    localizable_path = "/Users/muhammad/Development/Personal/Startups/booklet/bookletpdf/bookletPdf/Utils/Resources/Localizable.xcstrings"
+    parser = argparse.ArgumentParser(description="Add missing translations to Localizable.xcstrings")
+    parser.add_argument('localizable_path', nargs='?', default=DEFAULT_LOCALIZABLE_PATH,
+                        help="Path of the Localizable.xcstrings catalog to update")
+    add_translation_arguments(parser)
+    parser.add_argument('--profile', nargs='?', const='auto_translate_profile.json', metavar='PATH',
+                        help="Profile each phase and write a JSON trace (default: auto_translate_profile.json)")
+    parser.add_argument('--chrome-trace', metavar='PATH',
+                        help="With --profile, also write a Chrome trace-event file")
+    args = parser.parse_args()
     
-    translator = AutoTranslator(localizable_path)
+    profiler = PhaseProfiler(enabled=bool(args.profile))
+    translator = AutoTranslator(args.localizable_path, profiler)
+    try:
+        configure_translator(translator, args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
     translator.run()
+    
+    if args.profile:
+        write_profile(profiler, 'auto_translate', args.profile, args.chrome_trace)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Help Page Checker for BookletPDF App
+Compares the localized Info_*.html help pages against the English Info.html
+"""
+
+import os
+import json
+import codecs
+import hashlib
+import argparse
+from pathlib import Path
+from difflib import SequenceMatcher
+from html.parser import HTMLParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from localization_checker import SKIPPED_DIR_PREFIXES
+
+HELP_CACHE_FILENAME = ".help_pages_cache.json"
+# Bump whenever parsing or hashing changes so cached skeletons are rebuilt
+HELP_CACHE_VERSION = 2
+# Bump whenever section keys or hashes change; older sync files are replaced by a new baseline
+HELP_SYNC_VERSION = 1
+READ_CHUNK_SIZE = 1 << 14
+
+# Elements that end a text segment; inline markup such as <strong> does not
+_BLOCK_TAGS = {
+    'html', 'body', 'div', 'p', 'section', 'article', 'header', 'footer', 'nav', 'main', 'aside',
+    'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'table', 'tr', 'td', 'th', 'blockquote', 'pre', 'title',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6'
+}
+# Headings at or above this level start a new section
+_SECTION_LEVEL = 2
+# Nothing inside these is translatable text
+_SKIPPED_TAGS = {'style', 'script', 'svg', 'noscript'}
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+class HelpPageParser(HTMLParser):
+    """Streaming parser that turns a help page into sections of skeleton items
+
+    Every h1/h2 opens a section. Its items are, in document order, ('h3', hash)
+    style subheadings, ('text <block>', hash) segments where <block> names the
+    enclosing element and class (e.g. "div.bullet-text"), ('link', href) and
+    ('anchor', id). Text is hashed as soon as its segment closes, so pages are
+    fed in chunks and never held as a tree.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = []
+        self._new_section(0, '')
+        self._blocks = []
+        self._text = []
+        self._skip_depth = 0
+
+    def _new_section(self, level: int, heading: str):
+        self.sections.append({'level': level, 'heading': heading, 'items': []})
+
+    def _flush(self):
+        text = ' '.join(''.join(self._text).split())
+        self._text = []
+        if not text:
+            return
+        tag, block = self._blocks[-1] if self._blocks else ('', '')
+        if tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+            level = int(tag[1])
+            if level <= _SECTION_LEVEL:
+                self._new_section(level, text)
+            self.sections[-1]['items'].append((tag, _hash(text)))
+        else:
+            self.sections[-1]['items'].append((f'text {block}', _hash(text)))
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth or tag in _SKIPPED_TAGS:
+            self._skip_depth += tag in _SKIPPED_TAGS
+            return
+        attrs = dict(attrs)
+        if tag in _BLOCK_TAGS:
+            self._flush()
+            css_class = (attrs.get('class') or '').split()
+            self._blocks.append((tag, f"{tag}.{css_class[0]}" if css_class else tag))
+        anchor = attrs.get('id') or (attrs.get('name') if tag == 'a' else None)
+        if anchor:
+            self.sections[-1]['items'].append(('anchor', anchor))
+        if tag == 'a' and attrs.get('href'):
+            self.sections[-1]['items'].append(('link', attrs['href']))
+
+    def handle_endtag(self, tag):
+        if self._skip_depth:
+            self._skip_depth -= tag in _SKIPPED_TAGS
+            return
+        if tag in _BLOCK_TAGS:
+            self._flush()
+            # Tolerate unclosed children, as browsers do
+            while self._blocks and self._blocks.pop()[0] != tag:
+                pass
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+        for section in self.sections:
+            section['hash'] = _hash('\n'.join(value for _, value in section['items']))
+            section['key'] = _hash(section['heading'])
+        if not self.sections[0]['items']:
+            # Nothing before the first heading
+            self.sections.pop(0)
+
+
+def _parse_help_page(path: str) -> Tuple[str, int, int, str, List[Dict]]:
+    """Parse one help page in chunks (runs inside pool workers)
+
+    Returns (path, size, mtime_ns, sha1, sections).
+    """
+    parser = HelpPageParser()
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            digest.update(chunk)
+            parser.feed(text_decoder.decode(chunk, final=not chunk))
+            if not chunk:
+                break
+    parser.close()
+    return path, stat.st_size, stat.st_mtime_ns, digest.hexdigest(), parser.sections
+
+
+def find_help_pages(directories: List[Path]) -> Dict[Path, Dict[str, Path]]:
+    """Group `Name.html` with its `Name_<lang>.html` translations found in directories"""
+    groups = {}
+    for directory in sorted(set(directories)):
+        pages = {path.stem: path for path in directory.glob('*.html')}
+        for stem, path in sorted(pages.items()):
+            base, _, language = stem.rpartition('_')
+            if base in pages and language:
+                groups.setdefault(pages[base], {})[language] = path
+    return groups
+
+
+def sync_path_for(english_path: Path) -> Path:
+    """Sync sidecar next to the English page, hidden so Xcode does not bundle it as a resource"""
+    return english_path.with_name(f".{english_path.stem}.sync.json")
+
+
+def _signature(section: Dict) -> Tuple:
+    """What must be the same in every language: heading level, item kinds, links and anchors"""
+    return (section['level'],) + tuple(kind if kind not in ('link', 'anchor') else f"{kind} {value}"
+                                       for kind, value in section['items'])
+
+
+def _describe_difference(english: Dict, translated: Dict) -> str:
+    english_kinds = Counter(_signature(english)[1:])
+    translated_kinds = Counter(_signature(translated)[1:])
+    parts = []
+    for kind in sorted(english_kinds.keys() | translated_kinds.keys()):
+        if english_kinds[kind] != translated_kinds[kind]:
+            parts.append(f"{kind.replace('text ', '')} {english_kinds[kind]}→{translated_kinds[kind]}")
+    return ', '.join(parts) or "items in a different order"
+
+
+class HelpPageChecker:
+    """Finds help page sections that are missing, restructured or out of date in a translation
+
+    Parsed sections are cached per page with the page's size and mtime, so only
+    changed pages are parsed again (in parallel with a worker pool). For every
+    translated section a sync file next to the English page remembers which
+    English text it was last brought in line with; when the English section
+    changes but the translation does not, the section is reported as out of
+    date. The sync file is meant to be committed so fresh clones and CI runs
+    compare against the same baseline; the parse cache is disposable.
+    """
+
+    def __init__(self, project_root: Path, use_cache: bool = True, executor: Optional[ProcessPoolExecutor] = None):
+        self.project_root = Path(project_root)
+        self.executor = executor
+        self.use_cache = use_cache
+        self.cache_path = self.project_root / HELP_CACHE_FILENAME
+        self.pages = {}
+        self.parsed = 0
+        self.reused = 0
+
+    def load_cache(self):
+        if not self.use_cache:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == HELP_CACHE_VERSION:
+            self.pages = data.get('pages', {})
+
+    def save_cache(self):
+        if not self.use_cache:
+            return
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': HELP_CACHE_VERSION, 'pages': self.pages}, f)
+        except OSError as e:
+            print(f"  ⚠️  Could not save help page cache: {e}")
+
+    def load_sync(self, english_path: Path) -> Dict[str, Dict[str, List[str]]]:
+        """Return language -> English section key -> [English hash, translated hash] for a page"""
+        try:
+            with open(sync_path_for(english_path), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  Ignoring unreadable help page sync file: {e}")
+            return {}
+        return data.get('languages', {}) if data.get('version') == HELP_SYNC_VERSION else {}
+
+    def save_sync(self, english_path: Path, languages: Dict[str, Dict[str, List[str]]]):
+        try:
+            with open(sync_path_for(english_path), 'w', encoding='utf-8') as f:
+                json.dump({'version': HELP_SYNC_VERSION, 'page': english_path.name, 'languages': languages},
+                          f, ensure_ascii=False, indent=2, sort_keys=True)
+                f.write('\n')
+        except OSError as e:
+            print(f"  ⚠️  Could not save help page sync file: {e}")
+
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.project_root).as_posix()
+
+    def load_pages(self, paths: List[Path]) -> Dict[str, List[Dict]]:
+        """Return sections per page, parsing only pages whose size or mtime changed"""
+        pending = []
+        for path in paths:
+            entry = self.pages.get(self._rel(path))
+            stat = path.stat()
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                self.reused += 1
+            else:
+                pending.append(str(path))
+        if self.executor and len(pending) > 1:
+            results = self.executor.map(_parse_help_page, pending)
+        else:
+            results = map(_parse_help_page, pending)
+        for path, size, mtime_ns, digest, sections in results:
+            self.parsed += 1
+            self.pages[self._rel(Path(path))] = {
+                'size': size, 'mtime_ns': mtime_ns, 'sha1': digest,
+                'sections': [dict(section, items=[list(item) for item in section['items']]) for section in sections]
+            }
+        return {self._rel(path): self.pages[self._rel(path)]['sections'] for path in paths}
+
+    def compare(self, english: List[Dict], translated: List[Dict], sync: Dict[str, List[str]],
+                accept: bool = False) -> Dict[str, List]:
+        """Align a translation with the English sections and classify the differences"""
+        result = {'missing': [], 'extra': [], 'restructured': [], 'outdated': []}
+        # An edited English heading changes the section key; carry its sync state over by position
+        current_keys = [section['key'] for section in english]
+        orphans = [key for key in sync if key not in set(current_keys)]
+        fresh = [key for key in current_keys if key not in sync]
+        for old_key, new_key in zip(orphans, fresh):
+            sync[new_key] = sync.pop(old_key)
+        for key in orphans[len(fresh):]:
+            del sync[key]
+
+        matcher = SequenceMatcher(None, [_signature(s) for s in english], [_signature(s) for s in translated],
+                                  autojunk=False)
+        for tag, e_start, e_end, t_start, t_end in matcher.get_opcodes():
+            pairs = list(zip(range(e_start, e_end), range(t_start, t_end)))
+            if tag == 'replace':
+                for e_index, t_index in pairs:
+                    result['restructured'].append((english[e_index]['heading'],
+                                                   _describe_difference(english[e_index], translated[t_index])))
+            if tag in ('delete', 'replace'):
+                result['missing'].extend(section['heading'] for section in english[e_start + len(pairs):e_end])
+            if tag in ('insert', 'replace'):
+                result['extra'].extend(section['heading'] for section in translated[t_start + len(pairs):t_end])
+            if tag != 'equal':
+                continue
+            # Only sections with the same structure can be compared for staleness
+            for e_index, t_index in pairs:
+                e_section, t_section = english[e_index], translated[t_index]
+                state = sync.get(e_section['key'])
+                # A translation edited since the last run is taken to follow the current English text
+                if accept or state is None or state[1] != t_section['hash']:
+                    sync[e_section['key']] = [e_section['hash'], t_section['hash']]
+                elif state[0] != e_section['hash']:
+                    result['outdated'].append(e_section['heading'])
+        return result
+
+    def check(self, groups: Dict[Path, Dict[str, Path]], accept: bool = False) -> Dict:
+        """Check every translated page against its English page"""
+        self.load_cache()
+        paths = [path for english, translations in groups.items() for path in [english, *translations.values()]]
+        sections = self.load_pages(paths)
+        live = {self._rel(path) for path in paths}
+        self.pages = {path: entry for path, entry in self.pages.items() if path in live}
+        results = {}
+        for english_path, translations in groups.items():
+            english = sections[self._rel(english_path)]
+            stored = self.load_sync(english_path)
+            languages = {language: dict(stored.get(language, {})) for language in translations}
+            page_results = {}
+            for language, path in sorted(translations.items()):
+                page_results[language] = dict(self.compare(english, sections[self._rel(path)], languages[language],
+                                                           accept), path=path)
+            results[english_path] = page_results
+            if languages != stored:
+                self.save_sync(english_path, languages)
+        self.save_cache()
+        return results
+
+    def print_report(self, results: Dict) -> int:
+        """Print the differences per page and language; returns the number of issues"""
+        issues = 0
+        print(f"\n📖 HELP PAGES ({self.parsed} parsed, {self.reused} unchanged)")
+        for english_path, page_results in results.items():
+            print(f"\n📄 {self._rel(english_path)}")
+            for language, result in page_results.items():
+                count = sum(len(result[kind]) for kind in ('missing', 'extra', 'restructured', 'outdated'))
+                issues += count
+                name = result['path'].name
+                if not count:
+                    print(f"  ✅ {language.upper()} ({name}): in sync")
+                    continue
+                print(f"  ⚠️  {language.upper()} ({name}): {count} issues")
+                for heading in result['missing']:
+                    print(f"    ❌ missing section: {heading}")
+                for heading in result['extra']:
+                    print(f"    ➕ extra section: {heading}")
+                for heading, difference in result['restructured']:
+                    print(f"    🔀 structure differs in {heading}: {difference}")
+                for heading in result['outdated']:
+                    print(f"    🕰️  out of date: {heading} (English changed since last synced)")
+        return issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare localized help pages with the English Info.html")
+    parser.add_argument('project_root', nargs='?', default='.', help="Root directory of the project")
+    parser.add_argument('--resources', type=Path, action='append',
+                        help="Directory holding the pages (default: every directory with a string catalog)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Worker processes for parsing (0 = one per CPU core)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Parse every page again, ignoring and not updating {HELP_CACHE_FILENAME}")
+    parser.add_argument('--accept', action='store_true',
+                        help="Record every translated section as up to date with the current English page")
+    args = parser.parse_args()
+
+    project_root = Path(args.project_root)
+    directories = args.resources or [path.parent for path in project_root.rglob('*.xcstrings')
+                                     if not any(part.startswith(SKIPPED_DIR_PREFIXES)
+                                                for part in path.parts)]
+    groups = find_help_pages([project_root / directory for directory in directories])
+    if not groups:
+        print("❌ No localized help pages found")
+        raise SystemExit(2)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        checker = HelpPageChecker(project_root, use_cache=not args.no_cache, executor=executor)
+        issues = checker.print_report(checker.check(groups, accept=args.accept))
+    finally:
+        if executor:
+            executor.shutdown()
+    print(f"\n🎯 {issues} help page issues" if issues else "\n🎉 All help pages are in sync!")
+    raise SystemExit(1 if issues else 0)
+
+
+if __name__ == "__main__":
+    main()
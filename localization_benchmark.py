@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Localization Tools Benchmark for BookletPDF App
+Generates synthetic projects and times every phase of the checker and the auto-translator
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from localization_checker import LocalizationChecker
+from auto_translate import AutoTranslator
+from xcstrings_stream import XCStringsReader
+
+DEFAULT_BASELINE = "localization_benchmark_baseline.json"
+# Languages in the order they are added as --languages grows
+LANGUAGES = ['en', 'de', 'fr', 'uz', 'uz-UZ', 'es', 'it', 'ru', 'tr', 'ja', 'ko', 'zh-Hans']
+# English words mixing dictionary terms, phrase patterns and unknown words
+VOCABULARY = ['settings', 'help', 'cancel', 'print', 'page', 'pages', 'document', 'booklet', 'open',
+              'select a', 'need help', 'not available', 'successfully', 'cover', 'layout', 'margin',
+              'preview', 'export', 'scanner', 'cloud', 'storage', 'error', 'language', 'format']
+SWIFT_TEMPLATE = '''import SwiftUI
+
+// Generated benchmark view {index}
+struct BenchmarkView{index}: View {{
+    @State private var isPresented = false
+    /* Keys mentioned in comments, like "str.commented_out".localize, must not count */
+    private let identifier = "benchmark.view.{index}"
+
+    var body: some View {{
+        VStack(alignment: .leading, spacing: 12) {{
+{lines}
+        }}
+        .padding()
+    }}
+}}
+'''
+
+PHASES = ['walk', 'extraction', 'catalog_load', 'completeness', 'intelligent_translate', 'save']
+
+
+def generate_project(root: Path, swift_files: int = 200, keys_per_file: int = 8, catalog_keys: int = 2000,
+                     languages: int = 5, missing_share: float = 0.1, seed: int = 42) -> Dict:
+    """Write a synthetic project with Swift sources and a Localizable.xcstrings catalog
+
+    Code uses keys drawn from a range slightly larger than the catalog, so a few
+    keys are missing from it; missing_share of the non-English localizations are
+    left out of the catalog. Returns the generation parameters.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    languages = LANGUAGES[:max(1, min(languages, len(LANGUAGES)))]
+    key_space = max(1, int(catalog_keys * 1.05))
+
+    for index in range(swift_files):
+        directory = root / 'App' / 'Sources' / f'Feature{index % 20:02d}'
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for _ in range(keys_per_file):
+            key = f"str.bench_key_{rng.randrange(key_space)}"
+            if rng.random() < 0.2:
+                lines.append(f'            Text("{key}".localize(arguments: "\\(index)"))')
+            else:
+                lines.append(f'            Text("{key}".localize) // {rng.choice(VOCABULARY)}')
+        source = SWIFT_TEMPLATE.format(index=index, lines='\n'.join(lines))
+        (directory / f'BenchmarkView{index}.swift').write_text(source, encoding='utf-8')
+
+    strings = {}
+    for index in range(catalog_keys):
+        english = ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.2:
+            english += rng.choice([':', '?', '!', '...'])
+        localizations = {}
+        for lang in languages:
+            if lang != 'en' and rng.random() < missing_share:
+                continue
+            value = english if lang == 'en' else f"[{lang.upper()}] {english}"
+            localizations[lang] = {"stringUnit": {"state": "translated", "value": value}}
+        strings[f"str.bench_key_{index}"] = {"extractionState": "manual", "localizations": localizations}
+
+    resources = root / 'App' / 'Resources'
+    resources.mkdir(parents=True, exist_ok=True)
+    with open(resources / 'Localizable.xcstrings', 'w', encoding='utf-8') as f:
+        json.dump({"sourceLanguage": "en", "strings": strings, "version": "1.0"}, f, indent=2, ensure_ascii=False)
+
+    return {
+        'swift_files': swift_files,
+        'keys_per_file': keys_per_file,
+        'catalog_keys': catalog_keys,
+        'languages': len(languages),
+        'missing_share': missing_share,
+        'seed': seed
+    }
+
+
+class BenchmarkRunner:
+    """Times each phase of the localization tools on a generated project"""
+
+    def __init__(self, project_root: Path, languages: List[str], jobs: int = 1, repeat: int = 3):
+        self.project_root = Path(project_root)
+        self.languages = set(languages)
+        self.jobs = jobs
+        self.repeat = repeat
+        self.catalog_path = self.project_root / 'App' / 'Resources' / 'Localizable.xcstrings'
+        self.pristine_catalog = self.catalog_path.read_bytes()
+
+    def _phases(self, checker: LocalizationChecker) -> List[Tuple[str, Callable[[], Tuple[int, int]]]]:
+        """Return (name, fn) pairs; each fn runs one phase and returns (items, bytes) processed
+
+        The phases share the checker, so each run must go through all of them in order.
+        """
+        translator = AutoTranslator(str(self.catalog_path))
+        english_values = []
+
+        def walk():
+            checker.swift_files, checker.catalog_paths = checker.find_project_files()
+            return len(checker.swift_files), 0
+
+        def extraction():
+            checker.localization_keys = checker.extract_localization_keys(checker.swift_files)
+            return len(checker.swift_files), sum(path.stat().st_size for path in checker.swift_files)
+
+        def catalog_load():
+            english_values.clear()
+            for key, entry in XCStringsReader(self.catalog_path).entries():
+                value = entry.get('localizations', {}).get('en', {}).get('stringUnit', {}).get('value')
+                if value:
+                    english_values.append((key, value))
+            return len(english_values), self.catalog_path.stat().st_size
+
+        def completeness():
+            checker.analyze_catalogs()
+            return len(english_values), self.catalog_path.stat().st_size
+
+        def translate():
+            for key, value in english_values:
+                translator.intelligent_translate(key, value)
+            return len(english_values), 0
+
+        def save():
+            translator.add_missing_translations()
+            size = self.catalog_path.stat().st_size
+            # Restore the catalog so every repetition saves the same amount of work
+            self.catalog_path.write_bytes(self.pristine_catalog)
+            return len(english_values), size
+
+        return list(zip(PHASES, [walk, extraction, catalog_load, completeness, translate, save]))
+
+    def _run_once(self, trace_memory: bool) -> Dict[str, Dict]:
+        results = {}
+        checker = LocalizationChecker(str(self.project_root), use_cache=False, jobs=self.jobs, use_index=False)
+        checker.supported_languages = self.languages
+        if self.jobs > 1:
+            checker.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        try:
+            for name, fn in self._phases(checker):
+                if trace_memory:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    items, size = fn()
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+                if trace_memory:
+                    tracemalloc.stop()
+                results[name] = {'seconds': seconds, 'items': items, 'bytes': size, 'peak_bytes': peak}
+        finally:
+            if checker.executor:
+                checker.executor.shutdown()
+        return results
+
+    def run(self) -> Dict[str, Dict]:
+        """Best wall time of `repeat` runs per phase plus the peak memory of a separate traced run
+
+        tracemalloc only sees this process, so with jobs > 1 the peak leaves
+        out whatever the worker processes allocate.
+        """
+        best = {}
+        for _ in range(self.repeat):
+            for name, result in self._run_once(trace_memory=False).items():
+                if name not in best or result['seconds'] < best[name]['seconds']:
+                    best[name] = result
+        # tracemalloc slows allocation-heavy code down, so memory gets its own run
+        for name, result in self._run_once(trace_memory=True).items():
+            best[name]['peak_bytes'] = result['peak_bytes']
+        for result in best.values():
+            seconds = result['seconds']
+            result['items_per_s'] = result['items'] / seconds if seconds else 0.0
+            result['mb_per_s'] = result['bytes'] / seconds / 1e6 if seconds else 0.0
+        return best
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                        time_threshold: float, memory_threshold: float) -> List[str]:
+    """Return a description of every phase that regressed beyond the thresholds"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if result['seconds'] > previous['seconds'] * (1 + time_threshold):
+            regressions.append(f"{name}: {result['seconds'] * 1000:.1f} ms vs "
+                               f"{previous['seconds'] * 1000:.1f} ms baseline")
+        if previous['peak_bytes'] and result['peak_bytes'] > previous['peak_bytes'] * (1 + memory_threshold):
+            regressions.append(f"{name}: peak {result['peak_bytes'] / 1e6:.1f} MB vs "
+                               f"{previous['peak_bytes'] / 1e6:.1f} MB baseline")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]]):
+    """Print one line per phase, with the change against the baseline when available"""
+    print(f"\n{'phase':<22}{'time':>11}{'items/s':>13}{'MB/s':>9}{'peak MB':>10}{'vs baseline':>13}")
+    for name in PHASES:
+        result = results[name]
+        change = ''
+        if baseline and baseline.get(name, {}).get('seconds'):
+            change = f"{(result['seconds'] / baseline[name]['seconds'] - 1) * 100:+.0f}%"
+        mb_per_s = f"{result['mb_per_s']:.1f}" if result['bytes'] else '-'
+        print(f"{name:<22}{result['seconds'] * 1000:>8.1f} ms{result['items_per_s']:>13,.0f}"
+              f"{mb_per_s:>9}{result['peak_bytes'] / 1e6:>10.2f}{change:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the localization checker and auto-translator on a synthetic project")
+    parser.add_argument('--files', type=int, default=200, help="Number of Swift files to generate")
+    parser.add_argument('--keys-per-file', type=int, default=8, help="Localized literals per Swift file")
+    parser.add_argument('--catalog-keys', type=int, default=2000, help="Number of keys in the generated catalog")
+    parser.add_argument('--languages', type=int, default=5, help=f"Number of languages (max {len(LANGUAGES)})")
+    parser.add_argument('--missing-share', type=float, default=0.1,
+                        help="Share of non-English translations left out of the catalog")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for the generator")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Worker processes for the checker")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per phase; the fastest one counts")
+    parser.add_argument('--baseline', type=Path, default=Path(DEFAULT_BASELINE), help="Baseline results file")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--time-threshold', type=float, default=0.25,
+                        help="Allowed slowdown per phase before it counts as a regression (0.25 = 25%%)")
+    parser.add_argument('--memory-threshold', type=float, default=0.25,
+                        help="Allowed growth of peak memory per phase before it counts as a regression")
+    parser.add_argument('--keep', type=Path, help="Generate the project here and keep it instead of using a temp dir")
+    args = parser.parse_args()
+
+    project_root = args.keep or Path(tempfile.mkdtemp(prefix='localization_benchmark_'))
+    try:
+        print(f"🏗️  Generating {args.files} Swift files and {args.catalog_keys} catalog keys in {project_root}...")
+        config = generate_project(project_root, args.files, args.keys_per_file, args.catalog_keys,
+                                  args.languages, args.missing_share, args.seed)
+        # Timings only compare between runs with the same worker count and repetitions
+        config.update(jobs=args.jobs, repeat=args.repeat)
+        print(f"⏱️  Running {args.repeat} repetitions per phase...")
+        runner = BenchmarkRunner(project_root, LANGUAGES[:config['languages']], args.jobs, args.repeat)
+        results = runner.run()
+    finally:
+        if not args.keep:
+            shutil.rmtree(project_root, ignore_errors=True)
+
+    baseline = None
+    if args.baseline.exists():
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        stored_config = stored.get('config', {})
+        if stored_config == config:
+            baseline = stored['phases']
+        else:
+            differences = ', '.join(f"{name} {stored_config.get(name)} → {value}" for name, value in config.items()
+                                    if stored_config.get(name) != value)
+            print(f"⚠️  Baseline in {args.baseline} was recorded with different settings ({differences}), not comparing")
+
+    print_results(results, baseline)
+    if args.jobs > 1:
+        print("ℹ️  Peak memory covers this process only, not the worker processes")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'phases': results}, f, indent=2)
+        print(f"\n💾 Baseline saved to: {args.baseline}")
+        return
+
+    if baseline:
+        regressions = compare_to_baseline(results, baseline, args.time_threshold, args.memory_threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
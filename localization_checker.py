@@ -5,112 +5,483 @@ Analyzes Swift files for localization keys and validates Localizable.xcstrings c
 """
 
 import os
-import re
+import sys
 import json
+import mmap
+import time
+import hashlib
+import argparse
 from pathlib import Path
-from typing import Set, Dict, List, Tuple
+from typing import Set, Dict, List, Tuple, Optional
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from swift_key_lexer import extract_key_sites
+from localization_index import INDEX_FILENAME, UsageIndex, format_site
+from localization_validators import VALIDATORS, validate_catalog
+from xcstrings_model import CatalogModel
+from localization_profiler import PhaseProfiler, write_profile
+
+DEFAULT_PROJECT_ROOT = "/Users/muhammad/Development/Personal/Startups/booklet/bookletpdf"
+CACHE_FILENAME = ".localization_cache.json"
+# Bump whenever the extraction rules change so stale cache entries are dropped
+EXTRACTOR_VERSION = 2
+SKIPPED_DIR_PREFIXES = ('.build', 'DerivedData', '.git')
+# `.localize` resolves through NSLocalizedString's default table
+LOCALIZABLE_TABLE = 'Localizable.xcstrings'
+
+def _walk_project(directory: str) -> Tuple[List[str], List[str], List[str]]:
+    """Collect Swift files, string catalogs and Swift package roots below a directory (runs inside pool workers)"""
+    swift_files = []
+    catalogs = []
+    package_roots = []
+    for root, dirs, files in os.walk(directory):
+        # Skip build and derived data directories
+        dirs[:] = [d for d in dirs if not d.startswith(SKIPPED_DIR_PREFIXES)]
+        for file in files:
+            if file.endswith('.swift'):
+                if file == 'Package.swift':
+                    package_roots.append(root)
+                else:
+                    swift_files.append(os.path.join(root, file))
+            elif file.endswith('.xcstrings'):
+                catalogs.append(os.path.join(root, file))
+    return swift_files, catalogs, package_roots
+
+def analyze_model(model: CatalogModel, code_keys: Optional[Set[str]], supported_languages: Set[str]) -> Dict:
+    """Compare a catalog model against the keys its owning target uses
+    
+    code_keys is None for tables that `.localize` never reads from; only their
+    translation completeness is checked.
+    """
+    results = {
+        'complete': [],
+        'missing_languages': defaultdict(list),
+        'missing_keys': [],
+        'extra_keys': []
+    }
+    
+    # Completeness per language is one bitset operation over all keys
+    results['complete'] = model.keys_of(model.complete(supported_languages))
+    for lang in supported_languages:
+        missing = model.missing(lang)
+        if missing:
+            results['missing_languages'][lang] = model.keys_of(missing)
+    
+    if code_keys is not None:
+        # Keys used in code but missing from the catalog, and keys in the catalog but not used in code
+        results['missing_keys'], results['extra_keys'] = model.compare_with_code(code_keys)
+    return results
+
+def _analyze_catalog(catalog_path: str, code_keys: Optional[Set[str]], supported_languages: Set[str]) -> Dict:
+    """Parse one string catalog and run analyze_model on it (runs inside pool workers)
+
+    The (wall, cpu) seconds spent parsing and comparing are returned under
+    'timings' for the profiler.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    
+    # Load every key of the catalog; the extractor is not limited to `str.` keys
+    error = None
+    try:
+        model = CatalogModel.from_catalog(catalog_path)
+    except (OSError, ValueError) as e:
+        error = str(e)
+        model = CatalogModel()
+    parsed_wall, parsed_cpu = time.perf_counter(), time.process_time()
+    
+    results = analyze_model(model, code_keys, supported_languages)
+    if error:
+        results['error'] = error
+    results['timings'] = {
+        'parse': (parsed_wall - wall_start, parsed_cpu - cpu_start),
+        'compare': (time.perf_counter() - parsed_wall, time.process_time() - parsed_cpu)
+    }
+    return results
+
+def _scan_swift_file(path: str, known_digest: Optional[str]) -> Tuple[str, int, int, str, Optional[List[Tuple[str, int, int]]]]:
+    """Read, hash and extract key usage sites from one Swift file (runs inside pool workers)
+
+    Returns (path, size, mtime_ns, sha1, sites) with sites as (key, line, column);
+    sites is None when the content hash equals known_digest, so the caller can
+    reuse its cached keys.
+    """
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        if not stat.st_size:
+            # Empty files cannot be mapped
+            return path, 0, stat.st_mtime_ns, hashlib.sha1().hexdigest(), []
+        # Hash and lex the same zero-copy mapping
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            digest = hashlib.sha1(buf).hexdigest()
+            if digest == known_digest:
+                return path, stat.st_size, stat.st_mtime_ns, digest, None
+            sites = extract_key_sites(buf)
+    return path, stat.st_size, stat.st_mtime_ns, digest, sites
+
+def _scan_swift_file_safe(args: Tuple[str, Optional[str]]):
+    """Pool-friendly wrapper that returns the exception instead of raising it"""
+    try:
+        return _scan_swift_file(*args)
+    except Exception as e:
+        return args[0], e
+
+class KeyCache:
+    """On-disk cache of the localization keys found in each Swift file"""
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+
+    def load(self):
+        """Load cached entries, discarding the file if it was written by another extractor version"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == EXTRACTOR_VERSION:
+            self.entries = data.get('files', {})
+
+    def save(self):
+        """Write the cache back to disk"""
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': EXTRACTOR_VERSION, 'files': self.entries}, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"  ⚠️  Could not save key cache: {e}")
+
+    def lookup(self, rel_path: str, stat: os.stat_result) -> Optional[List[str]]:
+        """Return cached keys when size and mtime are unchanged"""
+        entry = self.entries.get(rel_path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            self.hits += 1
+            return entry['keys']
+        return None
+
+    def digest(self, rel_path: str) -> Optional[str]:
+        """Return the last known content hash of a file"""
+        entry = self.entries.get(rel_path)
+        return entry['sha1'] if entry else None
+
+    def refresh(self, rel_path: str, size: int, mtime_ns: int) -> List[str]:
+        """Accept a file whose content hash still matches (e.g. after a touch or checkout)"""
+        entry = self.entries[rel_path]
+        entry['size'] = size
+        entry['mtime_ns'] = mtime_ns
+        self.hits += 1
+        return entry['keys']
+
+    def store(self, rel_path: str, size: int, mtime_ns: int, digest: str, keys: List[str]):
+        """Record freshly extracted keys for a file"""
+        self.misses += 1
+        self.entries[rel_path] = {
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'sha1': digest,
+            'keys': keys
+        }
+
+    def prune(self, live_paths: Set[str]):
+        """Drop entries for files that no longer exist"""
+        stale = [path for path in self.entries if path not in live_paths]
+        for path in stale:
+            del self.entries[path]
+        self.removed = len(stale)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
 
 class LocalizationChecker:
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, use_cache: bool = True, jobs: int = 1, verbose: bool = False,
+                 profiler: Optional[PhaseProfiler] = None, use_index: bool = True,
+                 checks: Optional[List[str]] = None, help_pages: bool = False):
         self.project_root = Path(project_root)
+        self.jobs = max(1, jobs)
+        self.verbose = verbose
+        self.executor = None
+        self.profiler = profiler or PhaseProfiler(enabled=False)
         self.swift_files = []
+        self.catalog_paths = []
+        self.package_roots = []
         self.localization_keys = set()
+        self.file_keys = {}
+        self.use_cache = use_cache
+        # The usage index keeps per-file keys itself; the JSON cache only serves runs without it
+        self.cache = KeyCache(self.project_root / CACHE_FILENAME) if use_cache and not use_index else None
+        # Opened on the first extraction so runs that never scan do not create it
+        self.use_index = use_index
+        self.index = None
+        # Names of the registered validators to run over every catalog; None skips validation
+        self.checks = checks
+        self.help_pages = help_pages
+        self.help_checker = None
         self.localizable_path = None
-        self.localizations_data = {}
         self.supported_languages = {'en', 'de', 'fr', 'uz', 'uz-UZ'}
         
-    def find_swift_files(self) -> List[Path]:
-        """Find all Swift files in the project"""
-        swift_files = []
-        for root, dirs, files in os.walk(self.project_root):
-            # Skip build and derived data directories
-            dirs[:] = [d for d in dirs if not d.startswith(('.build', 'DerivedData', '.git'))]
-            for file in files:
-                if file.endswith('.swift'):
-                    swift_files.append(Path(root) / file)
-        return swift_files
+    def find_project_files(self) -> Tuple[List[Path], List[Path]]:
+        """Find all Swift files and string catalogs in a single walk, sorted by path
+        
+        Swift package roots seen along the way are stored in package_roots.
+        """
+        if not self.executor:
+            walks = [_walk_project(str(self.project_root))]
+        else:
+            # Files at the top level are collected here, each top-level directory is walked by a worker
+            top_level = ([], [], [])
+            subdirs = []
+            for entry in os.scandir(self.project_root):
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(SKIPPED_DIR_PREFIXES):
+                        subdirs.append(entry.path)
+                elif entry.name == 'Package.swift':
+                    top_level[2].append(str(self.project_root))
+                elif entry.name.endswith('.swift'):
+                    top_level[0].append(entry.path)
+                elif entry.name.endswith('.xcstrings'):
+                    top_level[1].append(entry.path)
+            walks = [top_level, *self.executor.map(_walk_project, subdirs)]
+        
+        swift_files, catalogs, package_roots = [], [], []
+        for walk_swift, walk_catalogs, walk_packages in walks:
+            swift_files.extend(walk_swift)
+            catalogs.extend(walk_catalogs)
+            package_roots.extend(walk_packages)
+        self.package_roots = sorted(Path(path) for path in package_roots)
+        return sorted(Path(path) for path in swift_files), sorted(Path(path) for path in catalogs)
+    
+    def owner_of(self, path: Path) -> Optional[Path]:
+        """Return the innermost Swift package containing path, or None for the app target"""
+        owner = None
+        for package_root in self.package_roots:
+            if package_root in path.parents and (owner is None or owner in package_root.parents):
+                owner = package_root
+        return owner
+    
+    def main_catalog(self) -> Optional[Path]:
+        """Return the app target's Localizable.xcstrings, or the first catalog found"""
+        return next((path for path in self.catalog_paths if path.name == LOCALIZABLE_TABLE and not self.owner_of(path)),
+                    self.catalog_paths[0] if self.catalog_paths else None)
+    
+    def catalog_code_keys(self, catalog_path: Path) -> Optional[Set[str]]:
+        """Return the keys used by the target or package that owns a catalog
+        
+        A package catalog covers the package's own sources. The app catalog
+        covers the app sources plus every package without a catalog of its
+        own, since `.localize` falls back to the main bundle there.
+        """
+        if catalog_path.name != LOCALIZABLE_TABLE:
+            return None
+        owner = self.owner_of(catalog_path)
+        packages_with_catalog = {self.owner_of(path) for path in self.catalog_paths
+                                 if path.name == LOCALIZABLE_TABLE}
+        keys = set()
+        for file_path, file_keys in self.file_keys.items():
+            file_owner = self.owner_of(file_path)
+            if file_owner == owner or (owner is None and file_owner not in packages_with_catalog):
+                keys |= file_keys
+        return keys
     
     def extract_localization_keys(self, swift_files: List[Path]) -> Set[str]:
-        """Extract all localization keys from Swift files"""
-        localization_pattern = r'"(str\.[^"]+)"\.localize'
+        """Extract all localization keys from Swift files, reusing stored results for unchanged files
+        
+        With the usage index enabled it is the only per-file store: fresh files
+        take their keys from it and changed ones are re-indexed. Otherwise the
+        JSON key cache plays that part. Without use_cache every file is read.
+        """
         keys = set()
+        self.file_keys = {}
         
         print(f"🔍 Analyzing {len(swift_files)} Swift files...")
         
-        for file_path in swift_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    matches = re.findall(localization_pattern, content)
-                    if matches:
+        if self.cache:
+            with self.profiler.phase('cache_load') as phase:
+                self.cache.load()
+                phase.add(files=1)
+        if self.use_index and self.index is None:
+            with self.profiler.phase('index_load'):
+                self.index = UsageIndex(self.project_root / INDEX_FILENAME)
+        index = self.index
+        
+        # Fresh files only need a stat; everything else is read and scanned, in parallel when enabled
+        file_matches = {}
+        pending = []
+        live_paths = set()
+        fresh = 0
+        with self.profiler.phase('cache_lookup') as phase:
+            for file_path in swift_files:
+                rel_path = file_path.relative_to(self.project_root).as_posix()
+                live_paths.add(rel_path)
+                try:
+                    stat = file_path.stat()
+                except OSError as e:
+                    print(f"  ❌ Error reading {file_path}: {e}")
+                    continue
+                if index is not None:
+                    if self.use_cache and index.is_fresh(rel_path, stat):
+                        fresh += 1
+                    else:
+                        pending.append((str(file_path), index.digest(rel_path) if self.use_cache else None))
+                    continue
+                matches = self.cache.lookup(rel_path, stat) if self.cache else None
+                if matches is None:
+                    pending.append((str(file_path), self.cache.digest(rel_path) if self.cache else None))
+                else:
+                    file_matches[file_path] = matches
+            phase.add(files=len(swift_files))
+        
+        # Files are mapped once for hashing and lexing, so reading and extraction form one phase
+        with self.profiler.phase('read_and_extract') as phase:
+            if self.executor and len(pending) > 1:
+                chunksize = max(1, len(pending) // (self.jobs * 4))
+                results = self.executor.map(_scan_swift_file_safe, pending, chunksize=chunksize)
+            else:
+                results = map(_scan_swift_file_safe, pending)
+            
+            for result in results:
+                file_path = Path(result[0])
+                if isinstance(result[1], Exception):
+                    print(f"  ❌ Error reading {file_path}: {result[1]}")
+                    continue
+                _, size, mtime_ns, digest, sites = result
+                phase.add(bytes=size, files=1)
+                rel_path = file_path.relative_to(self.project_root).as_posix()
+                matches = sorted({key for key, _, _ in sites}) if sites is not None else None
+                if index is not None:
+                    if matches is None:
+                        index.refresh_file(rel_path, size, mtime_ns)
+                        fresh += 1
+                    else:
+                        index.update_file(rel_path, size, mtime_ns, digest, sites)
+                elif not self.cache:
+                    file_matches[file_path] = matches
+                elif matches is None:
+                    file_matches[file_path] = self.cache.refresh(rel_path, size, mtime_ns)
+                else:
+                    self.cache.store(rel_path, size, mtime_ns, digest, matches)
+                    file_matches[file_path] = matches
+        
+        if index is not None:
+            with self.profiler.phase('index_save'):
+                index.prune(live_paths)
+                # Read back after the updates, still inside the pending transaction
+                for rel_path, indexed_keys in index.file_keys().items():
+                    file_matches[self.project_root / rel_path] = indexed_keys
+                updated, removed = index.updated, index.removed
+                index.save()
+                index.updated = index.removed = 0
+            hit_rate = fresh / (fresh + updated) if fresh + updated else 0.0
+            print(f"♻️  Usage index: {fresh} hits, {updated} re-read, {removed} removed ({hit_rate:.0%} hit rate)")
+        
+        # Merge in path order so serial and parallel runs produce identical results
+        with self.profiler.phase('merge_keys'):
+            for file_path in sorted(file_matches):
+                matches = file_matches[file_path]
+                if matches:
+                    if self.verbose:
                         print(f"  📄 {file_path.name}: {len(matches)} keys found")
-                        for key in matches:
-                            keys.add(key)
-            except Exception as e:
-                print(f"  ❌ Error reading {file_path}: {e}")
+                    self.file_keys[file_path] = set(matches)
+                    keys.update(matches)
+        
+        if self.cache:
+            with self.profiler.phase('cache_save'):
+                self.cache.prune(live_paths)
+                self.cache.save()
+            print(f"♻️  Key cache: {self.cache.hits} hits, {self.cache.misses} re-read, "
+                  f"{self.cache.removed} removed ({self.cache.hit_rate:.0%} hit rate)")
         
         return keys
     
-    def find_localizable_file(self) -> Path:
-        """Find the Localizable.xcstrings file"""
-        for root, dirs, files in os.walk(self.project_root):
-            for file in files:
-                if file == 'Localizable.xcstrings':
-                    return Path(root) / file
-        raise FileNotFoundError("Localizable.xcstrings not found")
-    
-    def load_localizations(self, localizable_path: Path) -> Dict:
-        """Load and parse the Localizable.xcstrings file"""
-        try:
-            with open(localizable_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"❌ Error loading {localizable_path}: {e}")
-            return {}
+    def analyze_localization_completeness(self, catalog_path: Optional[Path] = None,
+                                          code_keys: Optional[Set[str]] = None) -> Dict:
+        """Analyze which keys are missing translations, streaming the catalog record by record"""
+        catalog_path = catalog_path or self.localizable_path
+        if code_keys is None:
+            code_keys = self.localization_keys
+        return _analyze_catalog(str(catalog_path), code_keys, self.supported_languages)
     
-    def analyze_localization_completeness(self) -> Dict:
-        """Analyze which keys are missing translations"""
-        results = {
+    def analyze_catalogs(self) -> Dict:
+        """Analyze every catalog against its owner's keys, concurrently when a pool is available
+        
+        Returns the per-catalog results under 'catalogs' plus the combined lists.
+        """
+        with self.profiler.phase('collect_code_keys'):
+            key_sets = [self.catalog_code_keys(path) for path in self.catalog_paths]
+        args = ([str(path) for path in self.catalog_paths], key_sets, repeat(self.supported_languages))
+        if self.executor and len(self.catalog_paths) > 1:
+            analyses = list(self.executor.map(_analyze_catalog, *args))
+        else:
+            analyses = list(map(_analyze_catalog, *args))
+        
+        combined = {
+            'catalogs': {},
             'complete': [],
             'missing_languages': defaultdict(list),
             'missing_keys': [],
             'extra_keys': []
         }
+        for path, analysis in zip(self.catalog_paths, analyses):
+            if self.profiler.enabled:
+                # Catalogs may have been analyzed in workers, which report their own timings
+                rel_path = path.relative_to(self.project_root)
+                self.profiler.record(f'json_parse {rel_path}', *analysis['timings']['parse'],
+                                     bytes=path.stat().st_size, files=1)
+                self.profiler.record(f'set_arithmetic {rel_path}', *analysis['timings']['compare'])
+            if 'error' in analysis:
+                print(f"❌ Error loading {path}: {analysis['error']}")
+            combined['catalogs'][path] = analysis
+            combined['complete'].extend(analysis['complete'])
+            combined['missing_keys'].extend(analysis['missing_keys'])
+            combined['extra_keys'].extend(analysis['extra_keys'])
+            for lang, keys in analysis['missing_languages'].items():
+                combined['missing_languages'][lang].extend(keys)
+        return combined
+    
+    def validate_catalogs(self, checks: Optional[List[str]] = None) -> Dict:
+        """Run the registered validators over every catalog, one pass per catalog
         
-        localizable_keys = set()
-        strings_data = self.localizations_data.get('strings', {})
-        
-        # Check each key in Localizable.xcstrings
-        for key, data in strings_data.items():
-            if key.startswith('str.'):
-                localizable_keys.add(key)
-                localizations = data.get('localizations', {})
-                available_languages = set(localizations.keys())
-                
-                # Check if all supported languages are present
-                missing_langs = self.supported_languages - available_languages
-                if not missing_langs:
-                    results['complete'].append(key)
-                else:
-                    for lang in missing_langs:
-                        results['missing_languages'][lang].append(key)
-        
-        # Find keys used in code but missing from Localizable.xcstrings
-        results['missing_keys'] = list(self.localization_keys - localizable_keys)
-        
-        # Find keys in Localizable.xcstrings but not used in code
-        results['extra_keys'] = list(localizable_keys - self.localization_keys)
-        
-        return results
+        Entries are validated in shards by the worker pool when one is running.
+        Returns the per-catalog results under 'catalogs' plus combined counts.
+        """
+        checks = checks or self.checks or list(VALIDATORS)
+        validation = {'checks': checks, 'catalogs': {}, 'counts': defaultdict(int)}
+        for path in self.catalog_paths:
+            with self.profiler.phase(f'validate {path.relative_to(self.project_root)}') as phase:
+                try:
+                    result = validate_catalog(path, checks, self.executor)
+                except (OSError, ValueError) as e:
+                    print(f"❌ Error validating {path}: {e}")
+                    continue
+                phase.add(bytes=path.stat().st_size, files=1)
+            validation['catalogs'][path] = result
+            for check, count in result['counts'].items():
+                validation['counts'][check] += count
+        return validation
+    
+    def check_help_pages(self) -> Dict:
+        """Compare the localized help pages next to each string catalog with the English page"""
+        from help_pages_checker import HelpPageChecker, find_help_pages
+        self.help_checker = HelpPageChecker(self.project_root, use_cache=self.use_cache,
+                                            executor=self.executor)
+        groups = find_help_pages([path.parent for path in self.catalog_paths])
+        return self.help_checker.check(groups) if groups else {}
+    
+    def key_display_name(self, key: str) -> str:
+        """Extract the semantic meaning from a key, e.g. str.clear_cache -> Clear Cache"""
+        return key.replace('str.', '').replace('_', ' ').title()
     
     def generate_missing_translations(self, missing_keys: List[str]) -> Dict:
         """Generate translation templates for missing keys"""
         translations = {}
         
         for key in missing_keys:
-            # Extract the semantic meaning from the key
-            key_name = key.replace('str.', '').replace('_', ' ').title()
+            key_name = self.key_display_name(key)
             
             translations[key] = {
                 "extractionState": "manual",
@@ -145,7 +516,7 @@ class LocalizationChecker:
         return translations
     
     def print_report(self, analysis: Dict):
-        """Print a detailed analysis report"""
+        """Print a detailed analysis report, one section per catalog"""
         print("\n" + "="*60)
         print("🌍 LOCALIZATION ANALYSIS REPORT")
         print("="*60)
@@ -153,8 +524,56 @@ class LocalizationChecker:
         print(f"\n📊 SUMMARY:")
         print(f"  • Swift files analyzed: {len(self.swift_files)}")
         print(f"  • Localization keys found in code: {len(self.localization_keys)}")
+        print(f"  • String catalogs analyzed: {len(analysis['catalogs'])}")
         print(f"  • Supported languages: {', '.join(sorted(self.supported_languages))}")
         
+        for catalog_path, catalog_analysis in analysis['catalogs'].items():
+            self.print_catalog_report(catalog_path, catalog_analysis)
+        
+        if 'validation' in analysis:
+            self.print_validation_report(analysis['validation'])
+        
+        if 'help_pages' in analysis:
+            analysis['help_page_issues'] = self.help_checker.print_report(analysis['help_pages'])
+    
+    def print_validation_report(self, validation: Dict):
+        """Print the validator findings, grouped by catalog and check"""
+        print("\n" + "-"*60)
+        print(f"🧪 CATALOG VALIDATION ({', '.join(validation['checks'])})")
+        print("-"*60)
+        for catalog_path, result in validation['catalogs'].items():
+            print(f"\n📄 {catalog_path.relative_to(self.project_root)}: {result['entries']} entries, "
+                  f"{len(result['findings'])} findings")
+            for check in validation['checks']:
+                findings = [finding for finding in result['findings'] if finding.check == check]
+                if not findings:
+                    continue
+                icon = {'error': '❌', 'warning': '⚠️ ', 'info': 'ℹ️ '}.get(findings[0].severity, '•')
+                print(f"  {icon} {VALIDATORS[check].description} ({len(findings)}):")
+                for finding in findings[:10]:  # Show first 10
+                    print(f"    - {finding.key} [{finding.language}]: {finding.message}")
+                if len(findings) > 10:
+                    print(f"    - ... and {len(findings) - 10} more")
+    
+    def key_locations(self, keys: List[str]) -> Dict[str, List[Tuple[str, int, int]]]:
+        """Return where keys are used according to the usage index, without rescanning"""
+        return self.index.locations(keys) if self.index is not None else {}
+    
+    def _location_suffix(self, locations: Dict[str, List[Tuple[str, int, int]]], key: str) -> str:
+        sites = locations.get(key)
+        if not sites:
+            return ""
+        more = f", +{len(sites) - 1} more" if len(sites) > 1 else ""
+        return f"  ({format_site(*sites[0])}{more})"
+    
+    def print_catalog_report(self, catalog_path: Path, analysis: Dict):
+        """Print the report sections for a single catalog"""
+        owner = self.owner_of(catalog_path)
+        owner_name = f"package {owner.name}" if owner else "app target"
+        print("\n" + "-"*60)
+        print(f"📄 {catalog_path.relative_to(self.project_root)} ({owner_name})")
+        print("-"*60)
+        
         print(f"\n✅ COMPLETE TRANSLATIONS ({len(analysis['complete'])}):")
         if analysis['complete']:
             for key in sorted(analysis['complete'])[:10]:  # Show first 10
@@ -164,31 +583,57 @@ class LocalizationChecker:
         else:
             print("  None")
         
-        print(f"\n❌ MISSING KEYS IN LOCALIZABLE.XCSTRINGS ({len(analysis['missing_keys'])}):")
-        if analysis['missing_keys']:
-            for key in sorted(analysis['missing_keys']):
-                print(f"  • {key}")
-        else:
-            print("  None")
+        if catalog_path.name == LOCALIZABLE_TABLE:
+            print(f"\n❌ MISSING KEYS IN {catalog_path.name.upper()} ({len(analysis['missing_keys'])}):")
+            if analysis['missing_keys']:
+                locations = self.key_locations(analysis['missing_keys'])
+                for key in sorted(analysis['missing_keys']):
+                    print(f"  • {key}{self._location_suffix(locations, key)}")
+            else:
+                print("  None")
         
         print(f"\n⚠️  INCOMPLETE TRANSLATIONS BY LANGUAGE:")
         for lang in sorted(self.supported_languages):
             missing_for_lang = analysis['missing_languages'].get(lang, [])
             print(f"  {lang.upper()}: {len(missing_for_lang)} missing")
             if missing_for_lang:
-                for key in sorted(missing_for_lang)[:5]:  # Show first 5
-                    print(f"    - {key}")
+                shown = sorted(missing_for_lang)[:5]  # Show first 5
+                locations = self.key_locations(shown)
+                for key in shown:
+                    print(f"    - {key}{self._location_suffix(locations, key)}")
                 if len(missing_for_lang) > 5:
                     print(f"    - ... and {len(missing_for_lang) - 5} more")
         
-        print(f"\n🔍 EXTRA KEYS IN LOCALIZABLE.XCSTRINGS ({len(analysis['extra_keys'])}):")
-        if analysis['extra_keys']:
-            for key in sorted(analysis['extra_keys'])[:10]:  # Show first 10
-                print(f"  • {key}")
-            if len(analysis['extra_keys']) > 10:
-                print(f"  ... and {len(analysis['extra_keys']) - 10} more")
-        else:
-            print("  None")
+        if catalog_path.name == LOCALIZABLE_TABLE:
+            print(f"\n🔍 EXTRA KEYS IN {catalog_path.name.upper()} ({len(analysis['extra_keys'])}):")
+            if analysis['extra_keys']:
+                for key in sorted(analysis['extra_keys'])[:10]:  # Show first 10
+                    print(f"  • {key}")
+                if len(analysis['extra_keys']) > 10:
+                    print(f"  ... and {len(analysis['extra_keys']) - 10} more")
+            else:
+                print("  None")
+    
+    def save_validation_report(self, validation: Dict, output_path: str):
+        """Save every validation finding as JSON, keyed by catalog"""
+        report = {
+            'checks': validation['checks'],
+            'counts': dict(validation['counts']),
+            'catalogs': {
+                str(path.relative_to(self.project_root)): {
+                    'entries': result['entries'],
+                    'counts': dict(result['counts']),
+                    'findings': [finding.to_dict() for finding in result['findings']]
+                }
+                for path, result in validation['catalogs'].items()
+            }
+        }
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"\n💾 Validation report saved to: {output_path}")
+        except OSError as e:
+            print(f"❌ Error saving validation report: {e}")
     
     def save_missing_keys_template(self, missing_keys: List[str], output_path: str):
         """Save a JSON template for missing keys"""
@@ -209,41 +654,115 @@ class LocalizationChecker:
         """Run the complete localization analysis"""
         print("🚀 Starting Localization Analysis...")
         
-        # Find Swift files
-        self.swift_files = self.find_swift_files()
-        
-        # Extract localization keys from Swift files
-        self.localization_keys = self.extract_localization_keys(self.swift_files)
-        print(f"✅ Found {len(self.localization_keys)} unique localization keys")
-        
-        # Find and load Localizable.xcstrings
-        try:
-            self.localizable_path = self.find_localizable_file()
-            print(f"📄 Found Localizable.xcstrings at: {self.localizable_path}")
-            self.localizations_data = self.load_localizations(self.localizable_path)
-        except FileNotFoundError as e:
-            print(f"❌ {e}")
-            return {}
-        
-        # Analyze completeness
-        analysis = self.analyze_localization_completeness()
-        
-        # Print report
-        self.print_report(analysis)
-        
-        # Save template for missing keys
-        if analysis['missing_keys']:
-            template_path = self.project_root / "missing_localizations_template.json"
-            self.save_missing_keys_template(analysis['missing_keys'], str(template_path))
+        with self.profiler.phase('run_analysis'):
+            if self.jobs > 1:
+                print(f"⚙️  Using {self.jobs} worker processes")
+                self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+            try:
+                # Find Swift files and string catalogs in one walk
+                with self.profiler.phase('walk') as phase:
+                    self.swift_files, self.catalog_paths = self.find_project_files()
+                    phase.add(files=len(self.swift_files) + len(self.catalog_paths))
+                
+                # Extract localization keys from Swift files
+                with self.profiler.phase('extract_keys'):
+                    self.localization_keys = self.extract_localization_keys(self.swift_files)
+                print(f"✅ Found {len(self.localization_keys)} unique localization keys")
+                
+                if not self.catalog_paths:
+                    print("❌ No .xcstrings catalogs found")
+                    return {}
+                for catalog_path in self.catalog_paths:
+                    print(f"📄 Found {catalog_path.name} at: {catalog_path}")
+                self.localizable_path = self.main_catalog()
+                
+                # Analyze completeness of every catalog against its owner's keys
+                with self.profiler.phase('analyze_catalogs'):
+                    analysis = self.analyze_catalogs()
+                
+                # All validators share one pass per catalog
+                if self.checks is not None:
+                    with self.profiler.phase('validate_catalogs'):
+                        analysis['validation'] = self.validate_catalogs()
+                
+                if self.help_pages:
+                    with self.profiler.phase('check_help_pages'):
+                        analysis['help_pages'] = self.check_help_pages()
+            finally:
+                if self.executor:
+                    self.executor.shutdown()
+                    self.executor = None
+            
+            # Print report
+            with self.profiler.phase('render_report'):
+                self.print_report(analysis)
+            
+            # Save template for missing keys
+            if analysis['missing_keys']:
+                template_path = self.project_root / "missing_localizations_template.json"
+                with self.profiler.phase('save_template'):
+                    self.save_missing_keys_template(sorted(set(analysis['missing_keys'])), str(template_path))
         
         return analysis
 
 def main():
-    # Set the project root path
-    project_root = "/Users/muhammad/Development/Personal/Startups/booklet/bookletpdf"
+    parser = argparse.ArgumentParser(description="Check localization keys used in Swift code against Localizable.xcstrings")
+    parser.add_argument('project_root', nargs='?', default=DEFAULT_PROJECT_ROOT,
+                        help="Root directory of the project to analyze")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Ignore and do not update the {CACHE_FILENAME} key cache")
+    parser.add_argument('--no-index', action='store_true',
+                        help=f"Do not maintain the {INDEX_FILENAME} key usage index")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of worker processes for scanning (0 = one per CPU core)")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Print the number of keys found in every Swift file")
+    parser.add_argument('--validate', nargs='?', const='all', metavar='CHECKS',
+                        help=f"Also validate catalog entries; comma-separated checks from "
+                             f"{', '.join(VALIDATORS)} (default: all)")
+    parser.add_argument('--validation-report', metavar='PATH',
+                        help="With --validate, write every finding to a JSON file")
+    parser.add_argument('--help-pages', action='store_true',
+                        help="Also compare the localized Info_<lang>.html help pages with the English one")
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help="Keep running and re-analyze incrementally whenever sources or catalogs change")
+    parser.add_argument('--poll', action='store_true',
+                        help="Watch by polling file timestamps instead of using inotify")
+    parser.add_argument('--profile', nargs='?', const='localization_profile.json', metavar='PATH',
+                        help="Profile each phase and write a JSON trace (default: localization_profile.json)")
+    parser.add_argument('--chrome-trace', metavar='PATH',
+                        help="With --profile, also write a Chrome trace-event file")
+    parser.add_argument('--since', metavar='REV',
+                        help="Only check Swift files and catalogs changed since a git revision (exits 1 on issues)")
+    args = parser.parse_args()
+    checks = None
+    if args.validate is not None:
+        checks = list(VALIDATORS) if args.validate == 'all' else args.validate.split(',')
+        unknown = [name for name in checks if name not in VALIDATORS]
+        if unknown:
+            parser.error(f"unknown checks: {', '.join(unknown)} (available: {', '.join(VALIDATORS)})")
     
     # Create and run the localization checker
-    checker = LocalizationChecker(project_root)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    profiler = PhaseProfiler(enabled=bool(args.profile))
+    checker = LocalizationChecker(args.project_root, use_cache=not args.no_cache,
+                                  jobs=jobs, verbose=args.verbose, profiler=profiler,
+                                  use_index=not args.no_index,
+                                  checks=checks, help_pages=args.help_pages)
+    
+    if args.since:
+        from localization_diff import DiffChecker, GitError
+        diff_checker = DiffChecker(checker, args.since)
+        try:
+            results = diff_checker.run()
+        except GitError as e:
+            print(f"❌ Git error: {e}")
+            sys.exit(2)
+        diff_checker.print_report(results)
+        issues = diff_checker.issue_count(results)
+        print(f"\n🎯 {issues} localization issues in this change" if issues else "\n🎉 This change is fully localized!")
+        sys.exit(1 if issues else 0)
+    
     analysis = checker.run_analysis()
     
     # Additional helpful output
@@ -260,6 +779,24 @@ def main():
             print(f"  • Fix {len(analysis['missing_keys'])} missing keys")
             print(f"  • Add {sum(len(keys) for keys in analysis['missing_languages'].values())} missing translations")
             print(f"  • Total issues to resolve: {total_issues}")
+        if 'validation' in analysis:
+            counts = analysis['validation']['counts']
+            if counts:
+                print(f"  • Review {sum(counts.values())} validation findings "
+                      f"({', '.join(f'{count} {check}' for check, count in sorted(counts.items()))})")
+            else:
+                print("  🎉 All catalog entries pass validation!")
+            if args.validation_report:
+                checker.save_validation_report(analysis['validation'], args.validation_report)
+        if analysis.get('help_page_issues'):
+            print(f"  • Update {analysis['help_page_issues']} help page sections")
+    
+    if args.profile:
+        write_profile(profiler, 'localization_checker', args.profile, args.chrome_trace)
+    
+    if args.watch:
+        from localization_watch import LocalizationWatch
+        LocalizationWatch(checker, polling=args.poll).run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Git-Diff-Scoped Localization Check for BookletPDF App
+Checks only the Swift files and catalogs changed since a base revision, for CI
+"""
+
+import io
+import subprocess
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from localization_checker import LocalizationChecker, LOCALIZABLE_TABLE, SKIPPED_DIR_PREFIXES
+from swift_key_lexer import extract_keys, extract_keys_from_file
+from xcstrings_stream import iter_languages_by_key
+
+
+class GitError(Exception):
+    """A git command failed"""
+
+
+def _git(root: Path, *args: str, input: Optional[bytes] = None, ok_codes: Tuple[int, ...] = (0,)) -> bytes:
+    """Run a git command in root and return its stdout"""
+    try:
+        result = subprocess.run(['git', *args], cwd=root, input=input, capture_output=True)
+    except OSError as e:
+        raise GitError(f"Could not run git: {e}")
+    if result.returncode not in ok_codes:
+        raise GitError(result.stderr.decode('utf-8', 'replace').strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def _split_z(output: bytes) -> List[str]:
+    return [item.decode('utf-8') for item in output.split(b'\0') if item]
+
+
+def _is_skipped(path: str) -> bool:
+    return any(part.startswith(SKIPPED_DIR_PREFIXES) for part in Path(path).parts[:-1])
+
+
+class DiffChecker:
+    """Compares the localization keys of changed files against the base revision
+
+    Only changed Swift files are lexed, once from the working tree and once
+    from the base revision. Keys a change drops are looked up with
+    `git grep` so unused-key detection stays correct without a full scan,
+    and changed catalogs are diffed against their base version to catch
+    keys or translations removed from a catalog while code still uses them.
+    """
+
+    def __init__(self, checker: LocalizationChecker, base: str):
+        self.checker = checker
+        self.root = checker.project_root
+        self.base = base
+        self.base_commit = None
+        self.prefix = ''
+        self.catalog_keys = {}
+        self.results = {}
+
+    def _changed_paths(self) -> Dict[str, str]:
+        """Return {path relative to the project root: status} for changes since base, untracked files included"""
+        changes = {}
+        entries = _split_z(_git(self.root, 'diff', '--name-status', '-z', '--no-renames', '--relative',
+                                self.base_commit, '--'))
+        for status, path in zip(entries[::2], entries[1::2]):
+            changes[path] = status[0]
+        for path in _split_z(_git(self.root, 'ls-files', '-z', '--others', '--exclude-standard')):
+            changes[path] = 'A'
+        return {path: status for path, status in changes.items() if not _is_skipped(path)}
+
+    def _project_layout(self):
+        """Collect package roots and catalogs from the git index, without walking the tree"""
+        paths = _split_z(_git(self.root, 'ls-files', '-z', '--cached', '--others', '--exclude-standard',
+                              '--', '*Package.swift', '*.xcstrings'))
+        package_roots, catalogs = [], []
+        for path in paths:
+            full_path = self.root / path
+            if _is_skipped(path) or not full_path.exists():
+                continue
+            if full_path.name == 'Package.swift':
+                package_roots.append(full_path.parent)
+            elif full_path.suffix == '.xcstrings':
+                catalogs.append(full_path)
+        self.checker.package_roots = sorted(set(package_roots))
+        self.checker.catalog_paths = sorted(set(catalogs))
+
+    def _base_blobs(self, paths: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        """Read files at the base revision through a single `git cat-file --batch`"""
+        paths = list(paths)
+        if not paths:
+            return {}
+        request = ''.join(f"{self.base_commit}:{self.prefix}{path}\n" for path in paths).encode('utf-8')
+        output = _git(self.root, 'cat-file', '--batch', input=request)
+        blobs = {}
+        pos = 0
+        for path in paths:
+            header_end = output.index(b'\n', pos)
+            header = output[pos:header_end].split()
+            pos = header_end + 1
+            if header[-1] == b'missing':
+                blobs[path] = None
+                continue
+            size = int(header[2])
+            blobs[path] = output[pos:pos + size]
+            pos += size + 1
+        return blobs
+
+    def catalog_for(self, file_path: Path) -> Optional[Path]:
+        """Return the Localizable catalog `.localize` resolves against for a Swift file"""
+        owner = self.checker.owner_of(file_path)
+        tables = [path for path in self.checker.catalog_paths if path.name == LOCALIZABLE_TABLE]
+        for path in tables:
+            if self.checker.owner_of(path) == owner:
+                return path
+        return next((path for path in tables if self.checker.owner_of(path) is None), None)
+
+    def _keys_in_catalog(self, catalog_path: Path) -> Dict[str, Set[str]]:
+        """Return {key: languages} of a working-tree catalog, loading each catalog once"""
+        if catalog_path not in self.catalog_keys:
+            try:
+                self.catalog_keys[catalog_path] = dict(iter_languages_by_key(catalog_path))
+            except (OSError, ValueError) as e:
+                print(f"❌ Error loading {catalog_path}: {e}")
+                self.catalog_keys[catalog_path] = {}
+        return self.catalog_keys[catalog_path]
+
+    def _usages(self, keys: Set[str]) -> Dict[str, Set[Path]]:
+        """Return the Swift files in the working tree that still use each key
+
+        `git grep` narrows the search to files containing the quoted key; the
+        lexer then confirms real uses, so keys in comments do not count.
+        """
+        usages = defaultdict(set)
+        if not keys:
+            return usages
+        patterns = []
+        for key in sorted(keys):
+            patterns += ['-e', f'"{key}"']
+        hits = _split_z(_git(self.root, 'grep', '-l', '-z', '-F', '--untracked', *patterns,
+                             '--', '*.swift', ok_codes=(0, 1)))
+        for path in hits:
+            if _is_skipped(path) or Path(path).name == 'Package.swift':
+                continue
+            file_path = self.root / path
+            try:
+                found = {key for key, _ in extract_keys_from_file(file_path)}
+            except OSError:
+                continue
+            for key in found & keys:
+                usages[key].add(file_path)
+        return usages
+
+    def run(self) -> Dict:
+        """Compute added, dropped and uncovered keys, and used keys that lost translations, since base"""
+        print(f"🚀 Checking localization changes since {self.base}...")
+        self.base_commit = _git(self.root, 'rev-parse', '--verify', f'{self.base}^{{commit}}').decode().strip()
+        self.prefix = _git(self.root, 'rev-parse', '--show-prefix').decode().strip()
+        changes = self._changed_paths()
+        self._project_layout()
+
+        swift_changes = {path: status for path, status in changes.items()
+                         if path.endswith('.swift') and Path(path).name != 'Package.swift'}
+        catalog_changes = {path: status for path, status in changes.items()
+                           if Path(path).name == LOCALIZABLE_TABLE}
+        print(f"🔍 {len(changes)} changed paths, {len(swift_changes)} Swift files, {len(catalog_changes)} catalogs")
+
+        base_blobs = self._base_blobs([path for path, status in {**swift_changes, **catalog_changes}.items()
+                                       if status != 'A'])
+
+        added = defaultdict(set)
+        dropped = defaultdict(set)
+        for path, status in sorted(swift_changes.items()):
+            file_path = self.root / path
+            new_keys = set()
+            if status != 'D' and file_path.exists():
+                new_keys = {key for key, _ in extract_keys_from_file(file_path)}
+            old_keys = set()
+            if base_blobs.get(path):
+                old_keys = {key for key, _ in extract_keys(base_blobs[path])}
+            for key in new_keys - old_keys:
+                added[key].add(file_path)
+            for key in old_keys - new_keys:
+                dropped[key].add(file_path)
+
+        # Keys a changed catalog no longer has, and languages its remaining keys lost, per catalog
+        removed_from_catalog = defaultdict(set)
+        lost_languages = defaultdict(dict)
+        for path, status in sorted(catalog_changes.items()):
+            catalog_path = self.root / path
+            old_catalog = {}
+            if base_blobs.get(path):
+                old_catalog = dict(iter_languages_by_key(io.BytesIO(base_blobs[path])))
+            new_catalog = self._keys_in_catalog(catalog_path) if status != 'D' else {}
+            removed_from_catalog[catalog_path] = set(old_catalog) - set(new_catalog)
+            for key, old_languages in old_catalog.items():
+                lost = (old_languages - new_catalog.get(key, old_languages)) & self.checker.supported_languages
+                if lost:
+                    lost_languages[catalog_path][key] = lost
+
+        usages = self._usages(set(dropped) | set().union(*removed_from_catalog.values())
+                              | set().union(*lost_languages.values()))
+
+        missing_keys = defaultdict(set)
+        missing_languages = defaultdict(set)
+        for key, files in added.items():
+            for file_path in files:
+                catalog_path = self.catalog_for(file_path)
+                if catalog_path is None:
+                    continue
+                languages = self._keys_in_catalog(catalog_path).get(key)
+                if languages is None:
+                    missing_keys[key].add(file_path)
+                else:
+                    for lang in self.checker.supported_languages - languages:
+                        missing_languages[lang].add(key)
+
+        # A removed catalog key is only a problem while code covered by that catalog still uses it
+        for catalog_path, keys in removed_from_catalog.items():
+            for key in keys:
+                for file_path in usages.get(key, ()):
+                    if self.catalog_for(file_path) == catalog_path:
+                        missing_keys[key].add(file_path)
+        for catalog_path, keys in lost_languages.items():
+            for key, languages in keys.items():
+                if any(self.catalog_for(file_path) == catalog_path for file_path in usages.get(key, ())):
+                    for lang in languages:
+                        missing_languages[lang].add(key)
+
+        unused_keys = []
+        for key, files in dropped.items():
+            catalogs = {self.catalog_for(file_path) for file_path in files} - {None}
+            for catalog_path in catalogs:
+                still_used = any(self.catalog_for(path) == catalog_path for path in usages.get(key, ()))
+                if not still_used and key in self._keys_in_catalog(catalog_path):
+                    unused_keys.append(key)
+
+        self.results = {
+            'added_keys': {key: sorted(files) for key, files in sorted(added.items())},
+            'dropped_keys': {key: sorted(files) for key, files in sorted(dropped.items())},
+            'missing_keys': {key: sorted(files) for key, files in sorted(missing_keys.items())},
+            'missing_languages': {lang: sorted(keys) for lang, keys in sorted(missing_languages.items())},
+            'extra_keys': sorted(set(unused_keys)),
+        }
+        return self.results
+
+    def print_report(self, results: Dict):
+        """Print the diff-scoped report"""
+        def rel(file_path: Path) -> str:
+            return str(file_path.relative_to(self.root))
+
+        print("\n" + "="*60)
+        print(f"🌍 LOCALIZATION CHANGES SINCE {self.base}")
+        print("="*60)
+
+        print(f"\n➕ KEYS ADDED IN CODE ({len(results['added_keys'])}):")
+        for key, files in results['added_keys'].items():
+            print(f"  • {key} ({', '.join(rel(path) for path in files)})")
+        if not results['added_keys']:
+            print("  None")
+
+        print(f"\n➖ KEYS DROPPED FROM CODE ({len(results['dropped_keys'])}):")
+        for key, files in results['dropped_keys'].items():
+            print(f"  • {key} ({', '.join(rel(path) for path in files)})")
+        if not results['dropped_keys']:
+            print("  None")
+
+        print(f"\n❌ KEYS MISSING FROM {LOCALIZABLE_TABLE.upper()} ({len(results['missing_keys'])}):")
+        for key, files in results['missing_keys'].items():
+            print(f"  • {key} ({', '.join(rel(path) for path in files)})")
+        if not results['missing_keys']:
+            print("  None")
+
+        print(f"\n⚠️  INCOMPLETE TRANSLATIONS FOR ADDED OR CHANGED KEYS:")
+        for lang in sorted(self.checker.supported_languages):
+            keys = results['missing_languages'].get(lang, [])
+            print(f"  {lang.upper()}: {len(keys)} missing")
+            for key in keys:
+                print(f"    - {key}")
+
+        print(f"\n🔍 KEYS NO LONGER USED BUT STILL IN {LOCALIZABLE_TABLE.upper()} ({len(results['extra_keys'])}):")
+        for key in results['extra_keys']:
+            print(f"  • {key}")
+        if not results['extra_keys']:
+            print("  None")
+
+    def issue_count(self, results: Dict) -> int:
+        """Number of problems that should fail a CI run"""
+        return len(results['missing_keys']) + sum(len(keys) for keys in results['missing_languages'].values())
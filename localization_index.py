@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Localization Usage Index for BookletPDF App
+Persistent SQLite index of where every localization key is used, with a query CLI
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+INDEX_FILENAME = ".localization_index.sqlite"
+# Bump whenever the schema or the extraction rules change; older files are rebuilt
+INDEX_VERSION = 1
+# SQLite refuses statements with more host parameters than this
+_MAX_PARAMETERS = 500
+
+_SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT NOT NULL
+);
+CREATE TABLE keys (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE usages (
+    key_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    PRIMARY KEY (key_id, file_id, line, col)
+) WITHOUT ROWID;
+CREATE INDEX usages_by_file ON usages (file_id);
+"""
+
+Site = Tuple[str, int, int]
+
+
+def _chunks(items: List, size: int = _MAX_PARAMETERS) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class UsageIndex:
+    """Key → (file, line, column) and file → keys index kept in one SQLite file
+
+    Keys are interned in their own table and usages are a WITHOUT ROWID table
+    clustered by key, so "where is this key used" is a single range scan and
+    the file stays small. Every file row carries the size, mtime and content
+    hash it was indexed at; only files whose stamp changed are re-indexed, in
+    one transaction committed by save().
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self.connection = sqlite3.connect(str(self.index_path))
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self._create()
+        self._stamps = None
+        self._key_ids = None
+        self.updated = 0
+        self.removed = 0
+
+    def _create(self):
+        with self.connection:
+            for (table,) in self.connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                self.connection.execute(f"DROP TABLE {table}")
+            self.connection.executescript(_SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> 'UsageIndex':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Incremental updates
+
+    @property
+    def stamps(self) -> Dict[str, Tuple[int, int, int, str]]:
+        """Indexed files as path -> (id, size, mtime_ns, sha1), loaded once"""
+        if self._stamps is None:
+            self._stamps = {path: (file_id, size, mtime_ns, digest) for file_id, path, size, mtime_ns, digest
+                            in self.connection.execute("SELECT id, path, size, mtime_ns, sha1 FROM files")}
+        return self._stamps
+
+    @property
+    def key_ids(self) -> Dict[str, int]:
+        """Interned keys as key -> id, loaded once"""
+        if self._key_ids is None:
+            self._key_ids = dict(self.connection.execute("SELECT key, id FROM keys"))
+        return self._key_ids
+
+    def is_fresh(self, rel_path: str, stat: os.stat_result) -> bool:
+        """Whether a file is indexed at its current size and mtime"""
+        stamp = self.stamps.get(rel_path)
+        return stamp is not None and stamp[1] == stat.st_size and stamp[2] == stat.st_mtime_ns
+
+    def digest(self, rel_path: str) -> Optional[str]:
+        """Content hash a file was last indexed at"""
+        stamp = self.stamps.get(rel_path)
+        return stamp[3] if stamp is not None else None
+
+    def refresh_file(self, rel_path: str, size: int, mtime_ns: int):
+        """Accept a file whose content hash still matches (e.g. after a touch or checkout)"""
+        file_id, _, _, digest = self.stamps[rel_path]
+        self.connection.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?", (size, mtime_ns, file_id))
+        self.stamps[rel_path] = (file_id, size, mtime_ns, digest)
+
+    def update_file(self, rel_path: str, size: int, mtime_ns: int, digest: str, sites: List[Site]):
+        """Replace the usages of one file"""
+        connection = self.connection
+        stamp = self.stamps.get(rel_path)
+        if stamp is None:
+            file_id = connection.execute(
+                "INSERT INTO files (path, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)",
+                (rel_path, size, mtime_ns, digest)).lastrowid
+        else:
+            file_id = stamp[0]
+            connection.execute("UPDATE files SET size = ?, mtime_ns = ?, sha1 = ? WHERE id = ?",
+                               (size, mtime_ns, digest, file_id))
+            connection.execute("DELETE FROM usages WHERE file_id = ?", (file_id,))
+        self.stamps[rel_path] = (file_id, size, mtime_ns, digest)
+        if sites:
+            key_ids = self.key_ids
+            for key, _, _ in sites:
+                if key not in key_ids:
+                    key_ids[key] = connection.execute("INSERT INTO keys (key) VALUES (?)", (key,)).lastrowid
+            connection.executemany("INSERT OR IGNORE INTO usages VALUES (?, ?, ?, ?)",
+                                   ((key_ids[key], file_id, line, col) for key, line, col in sites))
+        self.updated += 1
+
+    def remove_file(self, rel_path: str):
+        stamp = self.stamps.pop(rel_path, None)
+        if stamp is not None:
+            self.connection.execute("DELETE FROM usages WHERE file_id = ?", (stamp[0],))
+            self.connection.execute("DELETE FROM files WHERE id = ?", (stamp[0],))
+            self.removed += 1
+
+    def prune(self, live_paths: Set[str]):
+        """Drop files that no longer exist"""
+        for rel_path in [path for path in self.stamps if path not in live_paths]:
+            self.remove_file(rel_path)
+
+    def save(self):
+        """Drop keys nobody uses any more and commit the pending updates"""
+        if self.updated or self.removed:
+            # Only re-indexed or removed files can leave keys behind
+            self.connection.execute(
+                "DELETE FROM keys WHERE NOT EXISTS (SELECT 1 FROM usages WHERE key_id = keys.id)")
+            self._key_ids = None
+        self.connection.commit()
+
+    # Queries
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def used_keys(self) -> Set[str]:
+        return {key for (key,) in self.connection.execute("SELECT key FROM keys")}
+
+    def locations(self, keys: Iterable[str]) -> Dict[str, List[Tuple[str, int, int]]]:
+        """Return key -> [(path, line, column), ...] sorted by path and position"""
+        found = defaultdict(list)
+        for chunk in _chunks(sorted(set(keys))):
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.connection.execute(
+                "SELECT k.key, f.path, u.line, u.col FROM keys k "
+                "JOIN usages u ON u.key_id = k.id JOIN files f ON f.id = u.file_id "
+                f"WHERE k.key IN ({placeholders}) ORDER BY k.key, f.path, u.line, u.col", chunk)
+            for key, path, line, col in rows:
+                found[key].append((path, line, col))
+        return found
+
+    def sites_in_file(self, rel_path: str) -> List[Site]:
+        """Return (key, line, column) for every usage in one file, in source order"""
+        return self.connection.execute(
+            "SELECT k.key, u.line, u.col FROM files f "
+            "JOIN usages u ON u.file_id = f.id JOIN keys k ON k.id = u.key_id "
+            "WHERE f.path = ? ORDER BY u.line, u.col", (rel_path,)).fetchall()
+
+    def file_keys(self) -> Dict[str, Set[str]]:
+        """Return path -> keys for every file using at least one key"""
+        paths = dict(self.connection.execute("SELECT id, path FROM files"))
+        keys = dict(self.connection.execute("SELECT id, key FROM keys"))
+        file_keys = defaultdict(set)
+        for file_id, key_id in self.connection.execute("SELECT file_id, key_id FROM usages"):
+            file_keys[paths[file_id]].add(keys[key_id])
+        return file_keys
+
+
+def format_site(path: str, line: int, col: int) -> str:
+    return f"{path}:{line}:{col}"
+
+
+def _print_locations(locations: Dict[str, List[Tuple[str, int, int]]], keys: Iterable[str]):
+    for key in keys:
+        sites = locations.get(key, [])
+        print(f"🔑 {key} ({len(sites)} usages)")
+        for site in sites:
+            print(f"  {format_site(*site)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the localization usage index of a project")
+    parser.add_argument('--project-root', default=None,
+                        help="Root directory of the project (default: the checker's default project)")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Re-index changed Swift files before answering")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('update', help="Re-index changed Swift files")
+    usages_parser = subparsers.add_parser('usages', help="Where keys are used")
+    usages_parser.add_argument('keys', nargs='+')
+    file_parser = subparsers.add_parser('file', help="Keys used by Swift files")
+    file_parser.add_argument('paths', nargs='+', help="Paths relative to the project root")
+    subparsers.add_parser('unused', help="Catalog keys no Swift file of the owning target uses")
+    missing_parser = subparsers.add_parser('missing', help="Usage sites of keys missing in a language")
+    missing_parser.add_argument('language')
+    args = parser.parse_args()
+
+    from localization_checker import DEFAULT_PROJECT_ROOT, LocalizationChecker
+    checker = LocalizationChecker(args.project_root or DEFAULT_PROJECT_ROOT)
+    index_path = checker.project_root / INDEX_FILENAME
+    if args.command == 'update' or args.refresh or not index_path.exists():
+        checker.swift_files, checker.catalog_paths = checker.find_project_files()
+        checker.extract_localization_keys(checker.swift_files)
+        checker.index.close()
+        if args.command == 'update':
+            return
+
+    with UsageIndex(index_path) as index:
+        if args.command == 'usages':
+            _print_locations(index.locations(args.keys), args.keys)
+        elif args.command == 'file':
+            for rel_path in args.paths:
+                sites = index.sites_in_file(Path(rel_path).as_posix())
+                print(f"📄 {rel_path} ({len(sites)} usages)")
+                for key, line, col in sites:
+                    print(f"  {line}:{col}  {key}")
+        else:
+            from xcstrings_model import CatalogModel
+            if not checker.catalog_paths:
+                checker.swift_files, checker.catalog_paths = checker.find_project_files()
+            checker.file_keys = {checker.project_root / path: keys for path, keys in index.file_keys().items()}
+            found = 0
+            for catalog_path in checker.catalog_paths:
+                code_keys = checker.catalog_code_keys(catalog_path)
+                if code_keys is None:
+                    continue
+                model = CatalogModel.from_catalog(catalog_path)
+                rel_catalog = catalog_path.relative_to(checker.project_root)
+                if args.command == 'unused':
+                    _, unused = model.compare_with_code(code_keys)
+                    print(f"📄 {rel_catalog}: {len(unused)} unused keys")
+                    for key in unused:
+                        print(f"  • {key}")
+                    found += len(unused)
+                else:
+                    missing = set(model.keys_of(model.missing(args.language))) & code_keys
+                    missing |= code_keys - set(model.keys)
+                    print(f"📄 {rel_catalog}: {len(missing)} used keys missing in {args.language}")
+                    _print_locations(index.locations(missing), sorted(missing))
+                    found += len(missing)
+            sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Localization Pipeline for BookletPDF App
+Scans, analyzes, fills, validates and writes a string catalog in one process over one parsed copy
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from auto_translate import AutoTranslator, add_translation_arguments, configure_translator
+from localization_checker import LocalizationChecker, analyze_model
+from localization_profiler import PhaseProfiler, write_profile
+from localization_validators import VALIDATORS, validate_items
+from xcstrings_model import CatalogModel
+from xcstrings_stream import Catalog
+
+STAGES = ('scan', 'analyze', 'fill', 'validate', 'write')
+
+
+class LocalizationPipeline:
+    """Runs the checker, the translator and the validators over one loaded catalog
+
+    The catalog is parsed once into a Catalog. Analysis builds its bitset
+    model from those entries, keys used in code but missing from the catalog
+    are stubbed straight into it, the translator fills languages in place,
+    the validators read the same entries, and the result is written once at
+    the end. The Swift keys and their usage index come from a single scan.
+    """
+
+    def __init__(self, checker: LocalizationChecker, catalog_path: Optional[Path] = None,
+                 profiler: Optional[PhaseProfiler] = None):
+        self.checker = checker
+        self.catalog_path = Path(catalog_path) if catalog_path else None
+        self.profiler = profiler or PhaseProfiler(enabled=False)
+        self.catalog: Optional[Catalog] = None
+        self.translator: Optional[AutoTranslator] = None
+        self.analysis = None
+        self.stubbed = []
+        self.filled = 0
+        self.validation = None
+        self.written = 0
+
+    def load_catalog(self):
+        if self.catalog is not None:
+            return
+        if self.catalog_path is None:
+            if not self.checker.catalog_paths:
+                self.checker.swift_files, self.checker.catalog_paths = self.checker.find_project_files()
+            self.catalog_path = self.checker.main_catalog()
+            if self.catalog_path is None:
+                raise FileNotFoundError(f"No .xcstrings catalog found in {self.checker.project_root}")
+        with self.profiler.phase('load_catalog') as phase:
+            self.catalog = Catalog.load(self.catalog_path)
+            phase.add(bytes=self.catalog_path.stat().st_size, files=1)
+        self.checker.localizable_path = self.catalog_path
+        print(f"📄 Loaded {len(self.catalog.entries)} keys from {self.catalog_path}")
+
+    def scan(self):
+        """Find the Swift sources and extract their keys, refreshing the usage index"""
+        with self.profiler.phase('walk'):
+            self.checker.swift_files, self.checker.catalog_paths = self.checker.find_project_files()
+        with self.profiler.phase('extract_keys'):
+            self.checker.localization_keys = self.checker.extract_localization_keys(self.checker.swift_files)
+        print(f"✅ Found {len(self.checker.localization_keys)} unique localization keys")
+
+    def analyze(self) -> Dict:
+        """Compare the loaded catalog with the keys of its owning target and print the report"""
+        self.load_catalog()
+        with self.profiler.phase('analyze'):
+            model = CatalogModel.from_entries(self.catalog.items())
+            code_keys = self.checker.catalog_code_keys(self.catalog_path)
+            self.analysis = analyze_model(model, code_keys, self.checker.supported_languages)
+        with self.profiler.phase('render_report'):
+            self.checker.print_catalog_report(self.catalog_path, self.analysis)
+        return self.analysis
+
+    def stub_missing_keys(self) -> List[str]:
+        """Add an English stub for every key used in code but missing from the catalog"""
+        if not self.analysis:
+            return []
+        for key in self.analysis['missing_keys']:
+            entry = {
+                "extractionState": "manual",
+                "localizations": {
+                    "en": {
+                        "stringUnit": {
+                            "state": "needs_review",
+                            "value": self.checker.key_display_name(key)
+                        }
+                    }
+                }
+            }
+            if self.catalog.add(key, entry):
+                self.stubbed.append(key)
+        if self.stubbed:
+            print(f"🧩 Stubbed {len(self.stubbed)} missing keys into {self.catalog_path.name}")
+        return self.stubbed
+
+    def fill(self, args: argparse.Namespace) -> int:
+        """Stub missing keys, then add missing translations in memory"""
+        self.load_catalog()
+        self.stub_missing_keys()
+        self.translator = AutoTranslator(str(self.catalog_path), self.profiler)
+        configure_translator(self.translator, args, self.catalog.entries.items())
+        self.filled = self.translator.fill_catalog(self.catalog)
+        # Translations of a guessed English text need a human look as much as the guess itself
+        for key in self.stubbed:
+            for localization in self.catalog.added[key]['localizations'].values():
+                localization['stringUnit']['state'] = 'needs_review'
+        print(f"✅ Filled missing translations for {self.filled} keys")
+        self.translator.print_stale_summary()
+        if self.translator.memory:
+            print(f"🧠 {self.translator.memory_matches} translations reused from the translation memory")
+        return self.filled
+
+    def validate(self, checks: Optional[List[str]] = None) -> Dict:
+        """Run the validators over the catalog as it will be written"""
+        self.load_catalog()
+        with self.profiler.phase('validate'):
+            result = validate_items(self.catalog.items(), self.catalog, checks, self.checker.executor)
+        self.validation = {'checks': result['checks'], 'catalogs': {self.catalog_path: result},
+                           'counts': result['counts']}
+        self.checker.print_validation_report(self.validation)
+        return self.validation
+
+    def write(self) -> int:
+        """Write every change made by the earlier stages in one go"""
+        if self.catalog is None:
+            return 0
+        with self.profiler.phase('write') as phase:
+            self.written = self.catalog.save(self.profiler)
+            phase.add(files=1 if self.written else 0)
+        if self.written:
+            print(f"💾 Wrote {self.written} changed entries to {self.catalog_path}")
+        else:
+            print("💾 Nothing changed, catalog left untouched")
+        fingerprints = self.translator.fingerprints if self.translator else None
+        if fingerprints is not None and fingerprints.save():
+            print(f"🔏 Source fingerprints saved to {fingerprints.path}")
+        return self.written
+
+    def run(self, stages: List[str], args: argparse.Namespace, checks: Optional[List[str]] = None):
+        """Run the given stages in pipeline order"""
+        with self.profiler.phase('pipeline'):
+            if self.checker.jobs > 1:
+                self.checker.executor = ProcessPoolExecutor(max_workers=self.checker.jobs)
+            try:
+                if 'scan' in stages:
+                    self.scan()
+                if 'analyze' in stages:
+                    self.analyze()
+                if 'fill' in stages:
+                    self.fill(args)
+                if 'validate' in stages:
+                    self.validate(checks)
+            finally:
+                if self.checker.executor:
+                    self.checker.executor.shutdown()
+                    self.checker.executor = None
+            if 'write' in stages:
+                self.write()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and translate a project's string catalog in one pass")
+    parser.add_argument('project_root', help="Root directory of the project")
+    parser.add_argument('--catalog', type=Path, help="Catalog to work on (default: the app's Localizable.xcstrings)")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages to run, always in the order {' → '.join(STAGES)}")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="Run every stage except write")
+    parser.add_argument('--checks', help=f"Comma-separated validators to run (default: all of {', '.join(VALIDATORS)})")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore and do not update the key cache")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of worker processes for scanning and validation (0 = one per CPU core)")
+    add_translation_arguments(parser)
+    parser.add_argument('--profile', nargs='?', const='localization_pipeline_profile.json', metavar='PATH',
+                        help="Profile each stage and write a JSON trace (default: localization_pipeline_profile.json)")
+    parser.add_argument('--chrome-trace', metavar='PATH',
+                        help="With --profile, also write a Chrome trace-event file")
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)} (available: {', '.join(STAGES)})")
+    if 'analyze' in stages and 'scan' not in stages:
+        parser.error("the analyze stage needs the scan stage")
+    if args.dry_run and 'write' in stages:
+        stages.remove('write')
+    checks = args.checks.split(',') if args.checks else None
+    if checks and any(name not in VALIDATORS for name in checks):
+        parser.error(f"unknown checks: {args.checks} (available: {', '.join(VALIDATORS)})")
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    profiler = PhaseProfiler(enabled=bool(args.profile))
+    checker = LocalizationChecker(args.project_root, use_cache=not args.no_cache, jobs=jobs, profiler=profiler)
+    pipeline = LocalizationPipeline(checker, args.catalog, profiler)
+    print(f"🚀 Running {' → '.join(stages)}")
+    try:
+        pipeline.run(stages, args, checks)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    if args.profile:
+        write_profile(profiler, 'localization_pipeline', args.profile, args.chrome_trace)
+
+    findings = pipeline.validation['catalogs'][pipeline.catalog_path]['findings'] if pipeline.validation else []
+    errors = sum(finding.severity == 'error' for finding in findings)
+    print(f"\n🎯 {errors} validation errors left" if errors else "\n🎉 Pipeline finished")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
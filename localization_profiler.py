@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Phase Profiler for the BookletPDF Localization Tools
+Records wall time, CPU time, I/O volume and allocation peaks per phase
+"""
+
+import os
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Union
+
+
+class PhaseRecord:
+    """Measurements of one profiled phase"""
+
+    __slots__ = ('name', 'depth', 'start', 'wall', 'cpu', 'bytes', 'files', 'calls', 'peak_bytes',
+                 '_memory_start', '_peak_so_far')
+
+    def __init__(self, name: str, depth: int, start: float):
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.bytes = 0
+        self.files = 0
+        self.calls = 1
+        self.peak_bytes = 0
+        self._memory_start = 0
+        self._peak_so_far = 0
+
+    def add(self, bytes: int = 0, files: int = 0):
+        """Count bytes read and files handled by this phase"""
+        self.bytes += bytes
+        self.files += files
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'depth': self.depth,
+            'start': self.start,
+            'wall': self.wall,
+            'cpu': self.cpu,
+            'calls': self.calls,
+            'bytes': self.bytes,
+            'files': self.files,
+            'files_per_s': self.files / self.wall if self.wall else 0.0,
+            'mb_per_s': self.bytes / self.wall / 1e6 if self.wall else 0.0,
+            'peak_bytes': self.peak_bytes
+        }
+
+
+class _NullRecord:
+    """Stand-in yielded by a disabled profiler so instrumented code needs no checks"""
+
+    def add(self, bytes: int = 0, files: int = 0):
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+
+
+class PhaseProfiler:
+    """Collects nested phase measurements for one tool run
+
+    Phases nest through `with profiler.phase(name):`. Allocation peaks come from
+    tracemalloc and are relative to the memory in use when the phase started;
+    a parent's peak includes its children. Before Python 3.9 tracemalloc
+    cannot reset its peak, so a phase that stays below an earlier peak reports
+    its growth at the end instead of its own peak. Work done in worker processes is
+    reported through `record()` with the timings the workers measured, and
+    tight loops use `accumulate()` to sum many short calls into one record.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True):
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.records = []
+        self._stack = []
+        self._accumulated = {}
+        # Traced peak at the last reset, only needed when tracemalloc.reset_peak() is missing
+        self._peak_at_reset = 0
+        self._origin = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+
+    def _memory(self) -> tuple:
+        if not self.trace_memory:
+            return (0, 0)
+        current, peak = tracemalloc.get_traced_memory()
+        # A peak not above the one at the last reset may predate it
+        return current, peak if peak > self._peak_at_reset else current
+
+    def _reset_peak(self):
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else:
+            self._peak_at_reset = tracemalloc.get_traced_memory()[1]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Union[PhaseRecord, _NullRecord]]:
+        """Measure the enclosed block as one phase"""
+        if not self.enabled:
+            yield _NULL_RECORD
+            return
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._peak_at_reset = 0
+        if self._stack and self.trace_memory:
+            parent = self._stack[-1]
+            parent._peak_so_far = max(parent._peak_so_far, self._memory()[1])
+        if self.trace_memory:
+            self._reset_peak()
+        record = PhaseRecord(name, len(self._stack), time.perf_counter() - self._origin)
+        record._memory_start = self._memory()[0]
+        self.records.append(record)
+        self._stack.append(record)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall_start
+            record.cpu = time.process_time() - cpu_start
+            self._stack.pop()
+            peak = max(record._peak_so_far, self._memory()[1])
+            record.peak_bytes = max(0, peak - record._memory_start)
+            if self._stack and self.trace_memory:
+                parent = self._stack[-1]
+                parent._peak_so_far = max(parent._peak_so_far, peak)
+                self._reset_peak()
+            if not self._stack:
+                self._accumulated = {}
+                if self.trace_memory:
+                    tracemalloc.stop()
+
+    def record(self, name: str, wall: float, cpu: float = 0.0, bytes: int = 0, files: int = 0):
+        """Add a phase measured elsewhere (e.g. in a worker process) under the current phase"""
+        if not self.enabled:
+            return
+        record = PhaseRecord(name, len(self._stack), time.perf_counter() - self._origin - wall)
+        record.wall, record.cpu = wall, cpu
+        record.add(bytes, files)
+        self.records.append(record)
+
+    @contextmanager
+    def accumulate(self, name: str) -> Iterator[None]:
+        """Time one call of a frequently called function, summed into a single record per parent phase"""
+        if not self.enabled:
+            yield
+            return
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            key = (id(self._stack[-1]) if self._stack else None, name)
+            record = self._accumulated.get(key)
+            if record is None:
+                record = PhaseRecord(name, len(self._stack), wall_start - self._origin)
+                record.calls = 0
+                self._accumulated[key] = record
+                self.records.append(record)
+            record.wall += wall
+            record.cpu += cpu
+            record.calls += 1
+
+    def to_dict(self, tool: str) -> Dict:
+        top_level = [record for record in self.records if record.depth == 0]
+        return {
+            'tool': tool,
+            'started_at': self.started_at,
+            'pid': os.getpid(),
+            'memory_traced': self.trace_memory,
+            'total_wall': sum(record.wall for record in top_level),
+            'total_cpu': sum(record.cpu for record in top_level),
+            'phases': [record.to_dict() for record in self.records]
+        }
+
+    def write_json(self, path: Union[str, Path], tool: str):
+        """Write the machine-readable trace"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(tool), f, indent=2)
+
+    def write_chrome_trace(self, path: Union[str, Path]):
+        """Write the phases as Chrome trace events (chrome://tracing, Perfetto)"""
+        events = []
+        for record in self.records:
+            data = record.to_dict()
+            events.append({
+                'name': record.name,
+                'ph': 'X',
+                'ts': record.start * 1e6,
+                'dur': record.wall * 1e6,
+                'pid': os.getpid(),
+                'tid': 0,
+                'args': {name: data[name] for name in ('cpu', 'calls', 'bytes', 'files', 'peak_bytes')}
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def print_summary(self):
+        """Print a table of all phases, children indented under their parents"""
+        width = max([len('  ' * record.depth + record.name) for record in self.records] + [28]) + 2
+        print(f"\n⏱️  PROFILE:")
+        print(f"  {'phase':<{width}}{'wall ms':>10}{'cpu ms':>10}{'calls':>8}{'files/s':>10}{'MB/s':>8}{'peak MB':>9}")
+        for record in self.records:
+            data = record.to_dict()
+            name = '  ' * record.depth + record.name
+            files_per_s = f"{data['files_per_s']:,.0f}" if record.files else '-'
+            mb_per_s = f"{data['mb_per_s']:.1f}" if record.bytes else '-'
+            peak = f"{record.peak_bytes / 1e6:.2f}" if self.trace_memory else '-'
+            print(f"  {name:<{width}}{record.wall * 1000:>10.1f}{record.cpu * 1000:>10.1f}{record.calls:>8}"
+                  f"{files_per_s:>10}{mb_per_s:>8}{peak:>9}")
+
+
+def write_profile(profiler: PhaseProfiler, tool: str, json_path: Union[str, Path],
+                  chrome_trace_path: Optional[Union[str, Path]] = None):
+    """Print the summary and write the JSON trace plus the optional Chrome trace"""
+    profiler.print_summary()
+    profiler.write_json(json_path, tool)
+    print(f"\n💾 Profile saved to: {json_path}")
+    if chrome_trace_path:
+        profiler.write_chrome_trace(chrome_trace_path)
+        print(f"💾 Chrome trace saved to: {chrome_trace_path}")
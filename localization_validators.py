@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Catalog Validators for BookletPDF App
+Pluggable quality checks that all run in one streaming pass over a string catalog
+"""
+
+import re
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from xcstrings_stream import XCStringsReader
+
+# Entries handed to a worker process at a time when validation is sharded
+SHARD_SIZE = 2000
+
+# printf-style specifier as used by String(format:) and `.localize(arguments:)`; the space flag
+# is left out because it would read plain text such as "50% done" or "50 % terminé" as arguments
+_FORMAT_SPECIFIER = re.compile(
+    r"%(?:(\d+)\$)?[-+#0']*(?:\d+|\*)?(?:\.(?:\d+|\*))?(hh|h|ll|l|q|L|z|t|j)?([@dDiuUxXoOfFeEgGaAcCsSp%])")
+# Conversions that accept the same argument
+_CONVERSION_ALIASES = {'D': 'd', 'i': 'd', 'U': 'u', 'O': 'o', 'F': 'f', 'E': 'e', 'G': 'g', 'A': 'a', 'X': 'x'}
+# `[DE] English text` is what intelligent_translate falls back to
+_FALLBACK_PREFIX = re.compile(r'^\[[A-Z]{2}(?:-[A-Z]{2})?\] ')
+
+
+class Finding:
+    """One problem found in one localization of a catalog entry"""
+
+    __slots__ = ('check', 'severity', 'key', 'language', 'message')
+
+    def __init__(self, check: str, severity: str, key: str, language: Optional[str], message: str):
+        self.check = check
+        self.severity = severity
+        self.key = key
+        self.language = language
+        self.message = message
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Validator:
+    """Base class for catalog checks
+
+    Subclasses set `name` and implement check_entry, which sees one entry at
+    a time and yields findings. Decorate them with @register_validator to run
+    them with every validation pass.
+    """
+
+    name = ''
+    severity = 'warning'
+    description = ''
+
+    def check_entry(self, key: str, entry: Dict, source_language: str) -> Iterator[Finding]:
+        raise NotImplementedError
+
+    def finding(self, key: str, language: Optional[str], message: str) -> Finding:
+        return Finding(self.name, self.severity, key, language, message)
+
+
+VALIDATORS: Dict[str, Type[Validator]] = {}
+
+
+def register_validator(cls: Type[Validator]) -> Type[Validator]:
+    """Class decorator adding a validator to the registry under its name"""
+    VALIDATORS[cls.name] = cls
+    return cls
+
+
+def iter_string_units(localization: Dict, path: str = '') -> Iterator[Tuple[str, Dict]]:
+    """Yield (variant path, stringUnit) for a localization, descending into plural and device variations"""
+    unit = localization.get('stringUnit')
+    if unit is not None:
+        yield path, unit
+    for kind, cases in (localization.get('variations') or {}).items():
+        for case, variation in cases.items():
+            yield from iter_string_units(variation, f"{path}{kind}.{case}/")
+
+
+def _variant_label(language: str, variant: str) -> str:
+    return f"{language} ({variant.rstrip('/')})" if variant else language
+
+
+def format_arguments(text: str) -> Tuple[Dict[int, str], Optional[str]]:
+    """Return argument position -> conversion for a format string, plus an error message if it is malformed"""
+    arguments = {}
+    sequential = positional = False
+    position = 0
+    for match in _FORMAT_SPECIFIER.finditer(text):
+        explicit, length, conversion = match.groups()
+        if conversion == '%':
+            continue
+        if explicit:
+            positional = True
+            index = int(explicit)
+        else:
+            sequential = True
+            position += 1
+            index = position
+        kind = (length or '') + _CONVERSION_ALIASES.get(conversion, conversion)
+        if arguments.setdefault(index, kind) != kind:
+            return arguments, f"argument {index} is used as both %{arguments[index]} and %{kind}"
+    if positional and sequential:
+        return arguments, "mixes positional (%1$@) and sequential (%@) arguments"
+    if arguments and sorted(arguments) != list(range(1, len(arguments) + 1)):
+        return arguments, f"argument positions {sorted(arguments)} have gaps"
+    return arguments, None
+
+
+def _describe(arguments: Dict[int, str]) -> str:
+    return ' '.join(f"%{index}${kind}" for index, kind in sorted(arguments.items())) or 'none'
+
+
+@register_validator
+class FormatSpecifierValidator(Validator):
+    """Translations must take the same arguments, in the same positions, as the source text"""
+
+    name = 'format'
+    severity = 'error'
+    description = "Format specifiers match the source language"
+
+    def check_entry(self, key, entry, source_language):
+        localizations = entry.get('localizations') or {}
+        # Without a source localization the key itself is the source text
+        source_units = dict(iter_string_units(localizations.get(source_language) or {}))
+        default_source = (source_units.get('') or {}).get('value', key)
+        for language, localization in localizations.items():
+            for variant, unit in iter_string_units(localization):
+                arguments, error = format_arguments(unit.get('value', ''))
+                if error:
+                    yield self.finding(key, _variant_label(language, variant), error)
+                    continue
+                if language == source_language:
+                    continue
+                source = (source_units.get(variant) or {}).get('value', default_source)
+                expected, _ = format_arguments(source)
+                # Plural cases such as "one" may spell the number out instead of using it
+                if arguments != expected and not (variant and set(arguments.items()) < set(expected.items())):
+                    yield self.finding(key, _variant_label(language, variant),
+                                       f"arguments {_describe(arguments)} do not match {_describe(expected)} in {source_language}")
+
+
+@register_validator
+class PlaceholderValidator(Validator):
+    """Generated TODO text and `[XX]` fallbacks must not ship"""
+
+    name = 'placeholders'
+    description = "No leftover TODO: or [XX] placeholder values"
+
+    def check_entry(self, key, entry, source_language):
+        for language, localization in (entry.get('localizations') or {}).items():
+            for variant, unit in iter_string_units(localization):
+                value = unit.get('value', '')
+                if 'TODO:' in value:
+                    yield self.finding(key, _variant_label(language, variant), f"TODO placeholder: {value!r}")
+                elif _FALLBACK_PREFIX.match(value):
+                    yield self.finding(key, _variant_label(language, variant), f"untranslated fallback: {value!r}")
+
+
+@register_validator
+class StateValidator(Validator):
+    """Every string unit should have been reviewed"""
+
+    name = 'state'
+    severity = 'info'
+    description = "String units are in the translated state"
+
+    def check_entry(self, key, entry, source_language):
+        for language, localization in (entry.get('localizations') or {}).items():
+            for variant, unit in iter_string_units(localization):
+                state = unit.get('state')
+                if state != 'translated':
+                    yield self.finding(key, _variant_label(language, variant), f"state is {state or 'missing'}")
+
+
+@register_validator
+class RegionalVariantValidator(Validator):
+    """A regional variant such as uz-UZ should say the same as its base language unless deliberately changed"""
+
+    name = 'variants'
+    description = "Regional variants (uz-UZ) agree with their base language (uz)"
+    variant_pairs = (('uz', 'uz-UZ'),)
+
+    def check_entry(self, key, entry, source_language):
+        localizations = entry.get('localizations') or {}
+        for base, variant_language in self.variant_pairs:
+            base_units = dict(iter_string_units(localizations.get(base) or {}))
+            variant_units = dict(iter_string_units(localizations.get(variant_language) or {}))
+            if not base_units and not variant_units:
+                continue
+            if not variant_units or not base_units:
+                present, absent = (base, variant_language) if base_units else (variant_language, base)
+                yield self.finding(key, absent, f"missing while {present} is translated")
+                continue
+            for variant in sorted(base_units.keys() | variant_units.keys()):
+                base_value = (base_units.get(variant) or {}).get('value')
+                variant_value = (variant_units.get(variant) or {}).get('value')
+                if base_value != variant_value:
+                    yield self.finding(key, _variant_label(variant_language, variant),
+                                       f"{variant_value!r} differs from {base} {base_value!r}")
+
+
+def validate_entries(entries: List[Tuple[str, Dict]], checks: List[str],
+                     source_language: str) -> List[Finding]:
+    """Run the named validators over a batch of entries (runs inside pool workers)"""
+    validators = [VALIDATORS[name]() for name in checks]
+    findings = []
+    for key, entry in entries:
+        for validator in validators:
+            findings.extend(validator.check_entry(key, entry, source_language))
+    return findings
+
+
+def _batches(entries: Iterable[Tuple[str, Dict]], size: int) -> Iterator[List[Tuple[str, Dict]]]:
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, size))
+        if not batch:
+            return
+        yield batch
+
+
+def validate_items(items: Iterable[Tuple[str, Dict]], layout, checks: Optional[List[str]] = None,
+                   executor=None, shard_size: int = SHARD_SIZE) -> Dict:
+    """Run every selected validator on each (key, entry) in one pass
+
+    layout supplies the catalog header (an XCStringsReader being iterated or
+    a loaded Catalog). With an executor the entries are handed out in shards
+    of shard_size while they are still being read. Returns the findings in
+    catalog order plus counts per check.
+    """
+    checks = list(checks or VALIDATORS)
+    unknown = [name for name in checks if name not in VALIDATORS]
+    if unknown:
+        raise ValueError(f"Unknown checks: {', '.join(unknown)} (available: {', '.join(VALIDATORS)})")
+    entry_count = 0
+
+    def counted():
+        nonlocal entry_count
+        for item in items:
+            entry_count += 1
+            yield item
+
+    shards = []
+    for batch in _batches(counted(), shard_size):
+        # sourceLanguage sorts before strings, so the header is known by the time entries arrive
+        args = (batch, checks, layout.header.get('sourceLanguage', 'en'))
+        shards.append(executor.submit(validate_entries, *args) if executor else validate_entries(*args))
+    if executor:
+        shards = [future.result() for future in shards]
+
+    findings = [finding for shard in shards for finding in shard]
+    return {
+        'entries': entry_count,
+        'checks': checks,
+        'findings': findings,
+        'counts': Counter(finding.check for finding in findings)
+    }
+
+
+def validate_catalog(catalog_path: Path, checks: Optional[List[str]] = None, executor=None,
+                     shard_size: int = SHARD_SIZE) -> Dict:
+    """Stream a catalog once through validate_items"""
+    reader = XCStringsReader(catalog_path)
+    return validate_items(reader.entries(), reader, checks, executor, shard_size)
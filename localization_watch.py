@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Watch Mode for the BookletPDF Localization Checker
+Keeps the key index and parsed catalogs in memory and re-analyzes only what changed
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from localization_checker import (
+    LocalizationChecker, SKIPPED_DIR_PREFIXES, _scan_swift_file, _walk_project
+)
+from xcstrings_stream import iter_languages_by_key
+
+# inotify(7) constants
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Extra time to wait for the rest of a burst of events (editors often write several times)
+DEBOUNCE_SECONDS = 0.05
+
+
+def _is_watched_file(name: str) -> bool:
+    return name.endswith(('.swift', '.xcstrings'))
+
+
+class InotifyWatcher:
+    """Recursive file change notifications through Linux inotify"""
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories = {}
+        self.overflowed = False
+        self._add_tree(root)
+
+    def _add_tree(self, root: Path) -> Set[Path]:
+        """Watch root and every directory below it; returns the relevant files already present"""
+        existing = set()
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith(SKIPPED_DIR_PREFIXES)]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC:
+                    raise OSError(error, "Out of inotify watches (raise fs.inotify.max_user_watches)")
+                continue
+            self._directories[wd] = Path(directory)
+            existing.update(Path(directory) / name for name in files if _is_watched_file(name))
+        return existing
+
+    def changes(self, timeout: float) -> Set[Path]:
+        """Block up to timeout seconds and return the relevant files that changed"""
+        changed = set()
+        deadline = None
+        while True:
+            wait = timeout if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], wait)
+            if not ready:
+                return changed
+            data = os.read(self._fd, 1 << 16)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._directories.pop(wd, None)
+                    continue
+                directory = self._directories.get(wd)
+                if directory is None:
+                    continue
+                path = directory / name
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and not name.startswith(SKIPPED_DIR_PREFIXES):
+                        # Files may have landed before the new watch existed
+                        changed |= self._add_tree(path)
+                elif _is_watched_file(name) or name == 'Package.swift':
+                    changed.add(path)
+            if deadline is None:
+                deadline = time.monotonic() + DEBOUNCE_SECONDS
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback that compares size and mtime snapshots of the project"""
+
+    def __init__(self, root: Path, interval: float = 0.5):
+        self.root = root
+        self.interval = interval
+        self.overflowed = False
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        swift_files, catalogs, package_roots = _walk_project(str(self.root))
+        manifests = [os.path.join(root, 'Package.swift') for root in package_roots]
+        for path in (*swift_files, *catalogs, *manifests):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[Path(path)] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout: float) -> Set[Path]:
+        """Poll until something changed or timeout seconds passed"""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+def create_watcher(root: Path, polling: bool = False):
+    """Return an inotify watcher on Linux, falling back to polling elsewhere or on failure"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(root)
+
+
+class LocalizationWatch:
+    """Incremental re-analysis driven by file change events
+
+    Per catalog it keeps the languages present for each key and a usage count
+    for each key in the sources that catalog covers. A changed Swift file only
+    adjusts those counts; a changed catalog is re-read on its own. Missing,
+    extra and incomplete keys are then recomputed in memory and printed as
+    deltas against the previous state.
+    """
+
+    def __init__(self, checker: LocalizationChecker, polling: bool = False):
+        self.checker = checker
+        self.polling = polling
+        self.catalog_languages = {}
+        self.key_usage = {}
+        self.state = {}
+
+    def _catalog_state(self, catalog_path: Path) -> Dict[str, Set]:
+        languages_by_key = self.catalog_languages[catalog_path]
+        catalog_keys = languages_by_key.keys()
+        state = {
+            'incomplete': {(lang, key) for key, languages in languages_by_key.items()
+                           for lang in self.checker.supported_languages - languages}
+        }
+        usage = self.key_usage.get(catalog_path)
+        if usage is not None:
+            code_keys = usage.keys()
+            state['missing'] = set(code_keys - catalog_keys)
+            state['extra'] = set(catalog_keys - code_keys)
+        return state
+
+    def _load_catalog(self, catalog_path: Path):
+        try:
+            self.catalog_languages[catalog_path] = dict(iter_languages_by_key(catalog_path))
+        except (OSError, ValueError) as e:
+            print(f"❌ Error loading {catalog_path}: {e}")
+            self.catalog_languages[catalog_path] = {}
+
+    def rebuild(self):
+        """Build the in-memory index from the checker's last full run"""
+        self.catalog_languages = {}
+        self.key_usage = {}
+        for catalog_path in self.checker.catalog_paths:
+            self._load_catalog(catalog_path)
+            code_keys = self.checker.catalog_code_keys(catalog_path)
+            if code_keys is not None:
+                self.key_usage[catalog_path] = Counter()
+        for file_path, keys in self.checker.file_keys.items():
+            self._count_usage(file_path, keys, 1)
+        self.state = {path: self._catalog_state(path) for path in self.checker.catalog_paths}
+
+    def _covering_catalogs(self, file_path: Path) -> Iterable[Path]:
+        """Catalogs whose code key set includes the keys of file_path"""
+        owner = self.checker.owner_of(file_path)
+        packages_with_catalog = {self.checker.owner_of(path) for path in self.key_usage}
+        for catalog_path in self.key_usage:
+            catalog_owner = self.checker.owner_of(catalog_path)
+            if catalog_owner == owner or (catalog_owner is None and owner not in packages_with_catalog):
+                yield catalog_path
+
+    def _count_usage(self, file_path: Path, keys: Iterable[str], delta: int):
+        for catalog_path in self._covering_catalogs(file_path):
+            usage = self.key_usage[catalog_path]
+            for key in keys:
+                usage[key] += delta
+                if usage[key] <= 0:
+                    del usage[key]
+
+    def _update_swift_file(self, file_path: Path):
+        old_keys = self.checker.file_keys.pop(file_path, set())
+        new_keys = set()
+        index = self.checker.index
+        rel_path = file_path.relative_to(self.checker.project_root).as_posix()
+        if file_path.exists():
+            try:
+                _, size, mtime_ns, digest, sites = _scan_swift_file(str(file_path), None)
+                new_keys = {key for key, _, _ in sites}
+                if index is not None:
+                    index.update_file(rel_path, size, mtime_ns, digest, sites)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"  ❌ Error reading {file_path}: {e}")
+        elif index is not None:
+            index.remove_file(rel_path)
+        if new_keys:
+            self.checker.file_keys[file_path] = new_keys
+        self._count_usage(file_path, old_keys - new_keys, -1)
+        self._count_usage(file_path, new_keys - old_keys, 1)
+
+    def apply(self, changed: Set[Path]) -> Set[Path]:
+        """Update the index for changed files; returns the catalogs whose state must be recomputed"""
+        dirty = set()
+        for path in sorted(changed):
+            if path.name == 'Package.swift' or (path.suffix == '.xcstrings'
+                                                and path.exists() != (path in self.catalog_languages)):
+                # Ownership changed: a package or catalog appeared or disappeared
+                return {None}
+            if path.suffix == '.xcstrings':
+                self._load_catalog(path)
+                dirty.add(path)
+            elif path.suffix == '.swift':
+                self._update_swift_file(path)
+                dirty.update(self._covering_catalogs(path))
+        self.checker.localization_keys = set().union(*self.checker.file_keys.values())
+        if self.checker.index is not None:
+            self.checker.index.save()
+        return dirty
+
+    def report_deltas(self, catalog_path: Path, old: Dict[str, Set], new: Dict[str, Set]) -> int:
+        """Print what changed for one catalog; returns the number of printed changes"""
+        name = catalog_path.relative_to(self.checker.project_root)
+        lines = []
+        for label, icon_added, icon_removed in (('missing', '❌', '✅'), ('extra', '🔍', '✅')):
+            for key in sorted(new.get(label, set()) - old.get(label, set())):
+                lines.append(f"  {icon_added} {label} key: {key}")
+            for key in sorted(old.get(label, set()) - new.get(label, set())):
+                lines.append(f"  {icon_removed} no longer {label}: {key}")
+        for lang, key in sorted(new['incomplete'] - old.get('incomplete', set())):
+            lines.append(f"  ⚠️  {lang.upper()} translation missing: {key}")
+        for lang, key in sorted(old.get('incomplete', set()) - new['incomplete']):
+            lines.append(f"  ✅ {lang.upper()} translation added: {key}")
+        if lines:
+            print(f"📄 {name}")
+            print('\n'.join(lines))
+        return len(lines)
+
+    def run(self, timeout: Optional[float] = None):
+        """Watch the project until interrupted (or until timeout seconds pass)"""
+        self.rebuild()
+        watcher = create_watcher(self.checker.project_root, self.polling)
+        kind = 'inotify' if isinstance(watcher, InotifyWatcher) else 'polling'
+        print(f"\n👀 Watching {self.checker.project_root} for changes ({kind}), Ctrl+C to stop")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                changed = watcher.changes(1.0)
+                if watcher.overflowed:
+                    watcher.overflowed = False
+                    changed = {None}
+                if not changed:
+                    continue
+                started = time.perf_counter()
+                dirty = {None} if None in changed else self.apply(changed)
+                if None in dirty:
+                    print("🔁 Project layout changed, running a full analysis...")
+                    self.checker.run_analysis()
+                    self.rebuild()
+                    continue
+                printed = 0
+                for catalog_path in sorted(dirty):
+                    new_state = self._catalog_state(catalog_path)
+                    printed += self.report_deltas(catalog_path, self.state.get(catalog_path, {}), new_state)
+                    self.state[catalog_path] = new_state
+                elapsed = (time.perf_counter() - started) * 1000
+                names = ', '.join(sorted(path.name for path in changed))
+                summary = "" if printed else ", no localization changes"
+                print(f"⚡ {names} re-analyzed in {elapsed:.1f} ms{summary}")
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+        finally:
+            watcher.close()
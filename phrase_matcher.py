@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Phrase Matcher for the BookletPDF Auto-Translator
+Finds the first phrase pattern (in table order) that occurs in a string with one scan
+"""
+
+import re
+from collections import deque
+from typing import List, Optional
+
+# A pattern without these characters matches itself literally
+_REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+# Global inline flags and backreferences change meaning inside a combined alternation
+_UNCOMBINABLE = re.compile(r'^\(\?[aiLmsux]+\)|\\[1-9]|\(\?P=')
+
+
+def is_literal(pattern: str) -> bool:
+    return not _REGEX_METACHARACTERS.intersection(pattern)
+
+
+class PhraseMatcher:
+    """Answers "which is the first pattern that re.search would find in this text?"
+
+    Literal patterns, the common case for glossaries, go into an Aho-Corasick
+    automaton, so a lookup costs one pass over the text no matter how many
+    phrases there are. The remaining regex patterns are combined into a single
+    alternation wrapped in a lookahead; scanning it reports, at every position,
+    the first alternative that matches there. The lowest pattern index across
+    both wins, which is exactly the table order the old loop honoured.
+    Patterns with global inline flags or backreferences are searched one by
+    one. Every regex keeps plain re.search semantics, without extra flags.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        # Lowest pattern index ending at each state, following failure links
+        self._output = [None]
+        self._regex_indexes = []
+        self._regex = None
+        self._separate = []
+        self._match_empty = None
+
+        regex_parts = []
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                # The empty pattern matches every string
+                self._match_empty = index if self._match_empty is None else self._match_empty
+            elif is_literal(pattern):
+                self._add_literal(pattern, index)
+            else:
+                try:
+                    compiled = re.compile(pattern)
+                except re.error as e:
+                    raise ValueError(f"Invalid phrase pattern {pattern!r}: {e}") from e
+                if _UNCOMBINABLE.search(pattern):
+                    self._separate.append((index, compiled))
+                else:
+                    self._regex_indexes.append(index)
+                    regex_parts.append(f'({pattern})')
+        self._build_failure_links()
+        if regex_parts:
+            self._regex = re.compile(f"(?=(?:{'|'.join(regex_parts)}))")
+            # Capture groups inside user patterns shift the numbering of ours
+            self._group_indexes = {}
+            group = 1
+            for index, part in zip(self._regex_indexes, regex_parts):
+                self._group_indexes[group] = index
+                group += re.compile(part).groups
+
+    def _add_literal(self, pattern: str, index: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = next_state
+        if self._output[state] is None or index < self._output[state]:
+            self._output[state] = index
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                inherited = self._output[self._fail[next_state]]
+                if inherited is not None and (self._output[next_state] is None
+                                              or inherited < self._output[next_state]):
+                    self._output[next_state] = inherited
+
+    def first_match(self, text: str) -> Optional[int]:
+        """Return the index of the first pattern occurring in text, or None"""
+        best = self._match_empty
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = output[state]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    return 0
+        if self._regex is not None:
+            for match in self._regex.finditer(text):
+                # Our wrapping group closes last, so lastindex always names it
+                index = self._group_indexes[match.lastindex]
+                if best is None or index < best:
+                    best = index
+        for index, compiled in self._separate:
+            if best is not None and index > best:
+                break
+            if compiled.search(text):
+                best = index
+                break
+        return best
+
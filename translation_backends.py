@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Translation Backends for the BookletPDF Auto-Translator
+Offline dictionary backend and a batching asyncio HTTP backend with a disk cache
+"""
+
+import os
+import ssl
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_CACHE_PATH = ".translation_cache.json"
+
+# Translations per source string, e.g. {"Cancel": {"de": "Abbrechen", "fr": "Annuler"}}
+Translations = Dict[str, Dict[str, str]]
+
+
+class BackendError(Exception):
+    """A translation request failed"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TranslationCache:
+    """On-disk cache of backend responses, kept separately per backend identity"""
+
+    def __init__(self, cache_path: str, namespace: str):
+        self.cache_path = cache_path
+        self.namespace = namespace
+        self.data = {}
+        self.entries = {}
+        self.dirty = False
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+        self.entries = self.data.setdefault(self.namespace, {})
+
+    def lookup(self, text: str, languages: Sequence[str]) -> Optional[Dict[str, str]]:
+        """Return cached translations when every requested language is present"""
+        cached = self.entries.get(text)
+        if cached and all(lang in cached for lang in languages):
+            return {lang: cached[lang] for lang in languages}
+        return None
+
+    def store(self, text: str, translations: Dict[str, str]):
+        self.entries.setdefault(text, {}).update(translations)
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"  ⚠️  Could not save translation cache: {e}")
+
+
+class TranslationBackend:
+    """Translates batches of English strings into several languages
+
+    Subclasses implement `translate_batch`. `translate_many` adds what every
+    backend needs: identical strings are translated once, strings are sent
+    in batches of batch_size with at most `concurrency` batches in flight, and
+    the optional disk cache is consulted first and updated afterwards.
+    """
+
+    name = 'backend'
+
+    def __init__(self, batch_size: int = 50, concurrency: int = 4, cache_path: Optional[str] = None):
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.cache = TranslationCache(cache_path, self.name) if cache_path else None
+        self.stats = {'strings': 0, 'unique': 0, 'cache_hits': 0, 'batches': 0, 'retries': 0,
+                      'fallback': 0, 'failed': 0}
+        self.latencies = []
+        # Texts answered by a fallback; their translations must not end up in this backend's cache
+        self.uncacheable = set()
+
+    async def translate_batch(self, texts: List[str], languages: Sequence[str]) -> List[Dict[str, str]]:
+        """Return one {language: translation} dict per text, in order"""
+        raise NotImplementedError
+
+    async def _run_batch(self, semaphore: asyncio.Semaphore, texts: List[str],
+                         languages: Sequence[str]) -> List[Optional[Dict[str, str]]]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                results = await self.translate_batch(texts, languages)
+            except BackendError as e:
+                print(f"  ❌ {self.name}: batch of {len(texts)} strings failed: {e}")
+                self.stats['failed'] += len(texts)
+                return [None] * len(texts)
+            self.latencies.append(time.perf_counter() - started)
+            self.stats['batches'] += 1
+            return results
+
+    async def translate_many(self, texts: Sequence[str], languages: Sequence[str]) -> Translations:
+        """Translate every distinct text; texts whose batch failed are left out of the result"""
+        unique = list(dict.fromkeys(text for text in texts if text))
+        self.stats['strings'] += len(texts)
+        self.stats['unique'] += len(unique)
+        results = {}
+        if self.cache:
+            self.cache.load()
+            for text in unique:
+                cached = self.cache.lookup(text, languages)
+                if cached is not None:
+                    results[text] = cached
+            self.stats['cache_hits'] += len(results)
+        pending = [text for text in unique if text not in results]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        responses = await asyncio.gather(*(self._run_batch(semaphore, batch, languages) for batch in batches))
+        for batch, translations in zip(batches, responses):
+            for text, translated in zip(batch, translations):
+                if translated:
+                    results[text] = translated
+                    if self.cache and text not in self.uncacheable:
+                        self.cache.store(text, translated)
+        if self.cache:
+            self.cache.save()
+        return results
+
+    def translate_all(self, texts: Sequence[str], languages: Sequence[str]) -> Translations:
+        """Blocking wrapper around translate_many"""
+        return asyncio.run(self.translate_many(texts, languages))
+
+
+class OfflineBackend(TranslationBackend):
+    """The built-in dictionaries and phrase patterns of AutoTranslator, no network needed"""
+
+    name = 'offline'
+
+    def __init__(self, translator, **kwargs):
+        super().__init__(**kwargs)
+        self.translator = translator
+
+    async def translate_batch(self, texts: List[str], languages: Sequence[str]) -> List[Dict[str, str]]:
+        results = []
+        for text in texts:
+            translated = self.translator.intelligent_translate('', text)
+            results.append({lang: translated.get(lang, f"[{lang.upper()}] {text}") for lang in languages})
+        return results
+
+
+class HttpBackend(TranslationBackend):
+    """JSON-over-HTTP translation service reached through asyncio streams
+
+    Each batch is one POST of {"source": "en", "targets": [...], "texts": [...]}
+    answered with {"translations": [{language: text}, ...]} in the same order.
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff and jitter. Batches that still fail go to the
+    fallback backend when one is given.
+    """
+
+    name = 'http'
+
+    def __init__(self, url: str, api_key: Optional[str] = None, retries: int = 3, backoff: float = 0.5,
+                 timeout: float = 30.0, fallback: Optional[TranslationBackend] = None, **kwargs):
+        self.name = f"http {url}"
+        super().__init__(**kwargs)
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported translation backend URL: {url}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.host_header = parts.netloc
+        self.api_key = api_key
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.fallback = fallback
+
+    async def _post_json(self, payload: Dict) -> Dict:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = [
+            f"POST {self.path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: close"
+        ]
+        if self.api_key:
+            headers.append(f"Authorization: Bearer {self.api_key}")
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        try:
+            writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                raise BackendError(f"Malformed response: {status_line!r}")
+            response_headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                response_headers[name.strip().lower()] = value.strip()
+            if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+                chunks = []
+                while True:
+                    size = int((await reader.readline()).split(b';')[0], 16)
+                    if not size:
+                        break
+                    chunks.append(await reader.readexactly(size))
+                    await reader.readline()
+                data = b''.join(chunks)
+            elif 'content-length' in response_headers:
+                data = await reader.readexactly(int(response_headers['content-length']))
+            else:
+                data = await reader.read()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        if status >= 400:
+            raise BackendError(f"HTTP {status}", retryable=status == 429 or status >= 500)
+        try:
+            return json.loads(data)
+        except ValueError:
+            raise BackendError("Response is not valid JSON", retryable=False)
+
+    async def translate_batch(self, texts: List[str], languages: Sequence[str]) -> List[Dict[str, str]]:
+        payload = {'source': 'en', 'targets': list(languages), 'texts': texts}
+        for attempt in range(self.retries + 1):
+            try:
+                response = await asyncio.wait_for(self._post_json(payload), self.timeout)
+                translations = response.get('translations')
+                if not isinstance(translations, list) or len(translations) != len(texts):
+                    raise BackendError("Response does not match the request", retryable=False)
+                return [{lang: str(item[lang]) for lang in languages if item.get(lang)} for item in translations]
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, BackendError) as e:
+                retryable = getattr(e, 'retryable', True)
+                if not retryable or attempt == self.retries:
+                    if self.fallback:
+                        self.stats['fallback'] += len(texts)
+                        self.uncacheable.update(texts)
+                        return await self.fallback.translate_batch(texts, languages)
+                    raise BackendError(str(e) or type(e).__name__, retryable)
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+
+def _percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+
+def benchmark(texts: int = 2000, duplicates: float = 0.3, batch_size: int = 50, concurrency: int = 8,
+              latency_ms: float = 20.0, fail_rate: float = 0.0, url: Optional[str] = None) -> Dict:
+    """Translate synthetic strings through the HTTP backend against the local stub server"""
+    from translation_stub_server import start_stub_server
+
+    server = None
+    if url is None:
+        server = start_stub_server(port=0, latency=latency_ms / 1000, fail_rate=fail_rate)
+        url = f"http://127.0.0.1:{server.server_address[1]}/translate"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        rng = random.Random(7)
+        unique_count = max(1, int(texts * (1 - duplicates)))
+        sources = [f"Benchmark string number {i}" for i in range(unique_count)]
+        corpus = [rng.choice(sources) for _ in range(texts)]
+        backend = HttpBackend(url, batch_size=batch_size, concurrency=concurrency, backoff=0.05)
+        started = time.perf_counter()
+        results = backend.translate_all(corpus, ['de', 'fr', 'uz'])
+        elapsed = time.perf_counter() - started
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+    return {
+        'seconds': elapsed,
+        'translated': len(results),
+        'strings_per_s': backend.stats['strings'] / elapsed if elapsed else 0.0,
+        'p50_ms': _percentile(backend.latencies, 0.5) * 1000,
+        'p95_ms': _percentile(backend.latencies, 0.95) * 1000,
+        'stats': backend.stats
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP translation backend against the local stub server")
+    parser.add_argument('--texts', type=int, default=2000, help="Number of strings to translate")
+    parser.add_argument('--duplicates', type=float, default=0.3, help="Share of repeated strings")
+    parser.add_argument('--batch-size', type=int, default=50, help="Strings per request")
+    parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Latency the stub server adds per request")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Share of stub requests answered with 503")
+    parser.add_argument('--url', help="Benchmark a running service instead of the built-in stub")
+    args = parser.parse_args()
+
+    print(f"⏱️  Translating {args.texts} strings in batches of {args.batch_size}, {args.concurrency} in flight...")
+    result = benchmark(args.texts, args.duplicates, args.batch_size, args.concurrency,
+                       args.latency_ms, args.fail_rate, args.url)
+    stats = result['stats']
+    print(f"✅ {result['translated']} unique strings translated in {result['seconds'] * 1000:.0f} ms "
+          f"({result['strings_per_s']:,.0f} strings/s)")
+    print(f"📦 {stats['batches']} batches, {stats['retries']} retries, {stats['fallback']} answered by the fallback, "
+          f"{stats['failed']} failed strings")
+    print(f"📈 Batch latency p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Translation Memory for BookletPDF App
+Indexes existing en→de/fr/uz pairs from Localizable.xcstrings for fuzzy reuse
+"""
+
+import os
+import json
+import heapq
+import argparse
+from pathlib import Path
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from xcstrings_stream import XCStringsReader
+
+DEFAULT_MEMORY_PATH = ".translation_memory.json"
+# Bump whenever the index layout or normalization changes
+MEMORY_VERSION = 1
+TARGET_LANGUAGES = ('de', 'fr', 'uz')
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace so trivial differences do not lower the score"""
+    return ' '.join(text.lower().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized string, padded so short strings still have some"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TranslationMemory:
+    """Fuzzy lookup of known translations through a trigram inverted index
+
+    Each English source string is stored once with its translations. The
+    index maps every trigram to the ids of the sources containing it, so a
+    lookup only touches sources that share at least one trigram with the
+    query. Candidates are scored with the Dice coefficient of the trigram
+    sets; sources too short or too long to reach the minimum score are
+    skipped before counting.
+    """
+
+    def __init__(self, languages: Tuple[str, ...] = TARGET_LANGUAGES):
+        self.languages = tuple(languages)
+        self.sources = []
+        self.translations = []
+        self.gram_counts = []
+        self.index = {}
+        self._by_source = {}
+        self.catalog_stamp = None
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def add(self, english: str, translations: Dict[str, str]):
+        """Remember the translations of an English string; the first one seen for a string wins"""
+        source = normalize(english)
+        translations = {lang: text for lang, text in translations.items() if lang in self.languages and text}
+        if not source or not translations:
+            return
+        entry_id = self._by_source.get(source)
+        if entry_id is not None:
+            for lang, text in translations.items():
+                self.translations[entry_id].setdefault(lang, text)
+            return
+        entry_id = len(self.sources)
+        grams = trigrams(source)
+        self._by_source[source] = entry_id
+        self.sources.append(source)
+        self.translations.append(translations)
+        self.gram_counts.append(len(grams))
+        for gram in grams:
+            self.index.setdefault(gram, []).append(entry_id)
+
+    @classmethod
+    def from_catalog(cls, catalog_path: Path, languages: Tuple[str, ...] = TARGET_LANGUAGES) -> 'TranslationMemory':
+        """Build the memory from the reviewed translations of a string catalog"""
+        memory = cls.from_entries(XCStringsReader(catalog_path).entries(), languages)
+        memory.catalog_stamp = _stamp(catalog_path)
+        return memory
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[str, Dict]],
+                     languages: Tuple[str, ...] = TARGET_LANGUAGES) -> 'TranslationMemory':
+        """Build the memory from (key, entry) pairs of a catalog that is already loaded"""
+        memory = cls(languages)
+        for _, entry in entries:
+            localizations = entry.get('localizations') or {}
+            english = (localizations.get('en') or {}).get('stringUnit') or {}
+            if not english.get('value'):
+                continue
+            translations = {}
+            for lang in memory.languages:
+                unit = (localizations.get(lang) or {}).get('stringUnit') or {}
+                # Only learn from translations a human has accepted
+                if unit.get('state') == 'translated' and unit.get('value'):
+                    translations[lang] = unit['value']
+            memory.add(english['value'], translations)
+        return memory
+
+    def search(self, english: str, min_score: float = 0.7, limit: int = 3,
+               language: Optional[str] = None) -> List[Tuple[float, str, Dict[str, str]]]:
+        """Return up to limit (score, source, translations) matches, best first
+
+        With language set, only sources translated into that language qualify.
+        """
+        source = normalize(english)
+        entry_id = self._by_source.get(source)
+        if entry_id is not None and (language is None or language in self.translations[entry_id]):
+            exact = [(1.0, source, dict(self.translations[entry_id]))]
+            if limit == 1:
+                return exact
+        else:
+            exact = []
+
+        grams = trigrams(source)
+        size = len(grams)
+        # Dice >= min_score needs min_score * (a + b) / 2 <= min(a, b)
+        low = size * min_score / (2 - min_score)
+        high = size * (2 - min_score) / min_score if min_score else float('inf')
+        gram_counts = self.gram_counts
+        shared = Counter()
+        for gram in grams:
+            for candidate in self.index.get(gram, ()):
+                if low <= gram_counts[candidate] <= high:
+                    shared[candidate] += 1
+
+        scored = []
+        for candidate, common in shared.items():
+            if candidate == entry_id:
+                continue
+            score = 2 * common / (size + gram_counts[candidate])
+            if score >= min_score and (language is None or language in self.translations[candidate]):
+                scored.append((score, candidate))
+        best = heapq.nlargest(limit - len(exact), scored)
+        return exact + [(score, self.sources[candidate], dict(self.translations[candidate]))
+                        for score, candidate in best]
+
+    def best_match(self, english: str, language: str, min_score: float = 0.7) -> Optional[Tuple[float, str]]:
+        """Return (score, translation) of the closest known string translated into language"""
+        matches = self.search(english, min_score, limit=1, language=language)
+        if not matches:
+            return None
+        score, _, translations = matches[0]
+        return score, translations[language]
+
+    def save(self, path: Path):
+        """Persist sources, translations and the index so a reload skips the rebuild"""
+        data = {
+            'version': MEMORY_VERSION,
+            'languages': list(self.languages),
+            'catalog_stamp': self.catalog_stamp,
+            'sources': self.sources,
+            'translations': self.translations,
+            'gram_counts': self.gram_counts,
+            'index': self.index
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['TranslationMemory']:
+        """Load a persisted memory, or None when it is missing or from another version"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != MEMORY_VERSION:
+            return None
+        memory = cls(tuple(data['languages']))
+        memory.catalog_stamp = data['catalog_stamp']
+        memory.sources = data['sources']
+        memory.translations = data['translations']
+        memory.gram_counts = data['gram_counts']
+        memory.index = data['index']
+        memory._by_source = {source: entry_id for entry_id, source in enumerate(memory.sources)}
+        return memory
+
+
+def _stamp(catalog_path: Path) -> List[int]:
+    stat = os.stat(catalog_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_or_build(catalog_path: Path, memory_path: Path, languages: Tuple[str, ...] = TARGET_LANGUAGES,
+                  entries: Optional[Iterable[Tuple[str, Dict]]] = None) -> TranslationMemory:
+    """Reuse the persisted memory while the catalog is unchanged, otherwise rebuild and save it
+
+    entries, when given, are the catalog's already parsed entries to rebuild from.
+    """
+    memory = TranslationMemory.load(memory_path)
+    if (memory is not None and memory.catalog_stamp == _stamp(catalog_path)
+            and memory.languages == tuple(languages)):
+        print(f"🧠 Translation memory loaded: {len(memory)} source strings")
+        return memory
+    if entries is None:
+        memory = TranslationMemory.from_catalog(catalog_path, languages)
+    else:
+        memory = TranslationMemory.from_entries(entries, languages)
+        memory.catalog_stamp = _stamp(catalog_path)
+    try:
+        memory.save(memory_path)
+    except OSError as e:
+        print(f"  ⚠️  Could not save translation memory: {e}")
+    print(f"🧠 Translation memory built: {len(memory)} source strings")
+    return memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up fuzzy matches in the translation memory of a string catalog")
+    parser.add_argument('catalog', type=Path, help="Localizable.xcstrings to build the memory from")
+    parser.add_argument('queries', nargs='*', help="English strings to look up")
+    parser.add_argument('--memory', type=Path, default=Path(DEFAULT_MEMORY_PATH), help="Persisted memory file")
+    parser.add_argument('--min-score', type=float, default=0.5, help="Minimum similarity (0-1)")
+    parser.add_argument('--limit', type=int, default=3, help="Matches shown per query")
+    args = parser.parse_args()
+
+    memory = load_or_build(args.catalog, args.memory)
+    for query in args.queries:
+        print(f"\n🔎 {query}")
+        matches = memory.search(query, args.min_score, args.limit)
+        if not matches:
+            print("  No match")
+        for score, source, translations in matches:
+            print(f"  {score:.0%}  {source}")
+            for lang in memory.languages:
+                if lang in translations:
+                    print(f"       {lang}: {translations[lang]}")
+
+
+if __name__ == "__main__":
+    main()
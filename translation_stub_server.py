@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Local Stand-In Translation Server for BookletPDF App
+Speaks the HttpBackend protocol so translations can be tested and benchmarked offline
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from auto_translate import AutoTranslator
+
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+    """Answers POSTed batches with the offline dictionary translations"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+            fail = server.rng.random() < server.fail_rate
+        if fail:
+            self._respond(503, {'error': 'Simulated failure'})
+            return
+        try:
+            request = json.loads(body)
+            texts, targets = request['texts'], request['targets']
+        except (ValueError, KeyError, TypeError):
+            self._respond(400, {'error': 'Expected {"texts": [...], "targets": [...]}'})
+            return
+        translations = []
+        for text in texts:
+            translated = server.translator.intelligent_translate('', text)
+            translations.append({lang: translated.get(lang, f"[{lang.upper()}] {text}") for lang in targets})
+        self._respond(200, {'translations': translations})
+
+    def _respond(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 8765, latency: float = 0.0,
+                      fail_rate: float = 0.0, verbose: bool = False) -> ThreadingHTTPServer:
+    """Create the stub server (port 0 picks a free port); call serve_forever() to run it"""
+    server = ThreadingHTTPServer((host, port), StubTranslationHandler)
+    server.daemon_threads = True
+    server.translator = AutoTranslator('')
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.verbose = verbose
+    server.requests = 0
+    server.rng = random.Random(0)
+    server.lock = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the translation service")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Delay added to every request")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.host, args.port, args.latency_ms / 1000, args.fail_rate, args.verbose)
+    print(f"🌐 Stub translation server listening on http://{args.host}:{server.server_address[1]}/translate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped after {server.requests} requests")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
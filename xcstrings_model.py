@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Compact Catalog Model for BookletPDF App
+Interned keys and languages with per-language bitsets for bulk completeness queries
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple, Union, BinaryIO
+
+from xcstrings_stream import XCStringsReader
+
+Source = Union[str, Path, BinaryIO]
+
+
+def _bitset(ids: Iterable[int], size: int) -> int:
+    """Build an int with the given bit positions set in one pass"""
+    bits = bytearray((size + 7) // 8)
+    for key_id in ids:
+        bits[key_id >> 3] |= 1 << (key_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _set_bit(row: bytearray, byte: int, bit: int):
+    if byte >= len(row):
+        # Grow in steps so appending keys stays amortized constant time
+        row.extend(bytes(byte - len(row) + 1 + (len(row) >> 1)))
+    row[byte] |= bit
+
+
+class CatalogModel:
+    """Key × language presence matrix of a string catalog
+
+    Keys and languages are interned into tables; key ids follow file order.
+    For every language there is one int whose bit i says whether key i has
+    that language. Completeness questions then become a handful of AND /
+    AND NOT operations over whole catalogs instead of a Python loop per key.
+    """
+
+    __slots__ = ('keys', 'key_ids', 'languages', 'language_ids', 'presence')
+
+    def __init__(self):
+        self.keys = []
+        self.key_ids = {}
+        self.languages = []
+        self.language_ids = {}
+        # language id -> bitset of keys having it
+        self.presence = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _intern(self, table: List[str], ids: Dict[str, int], name: str) -> int:
+        interned = ids.get(name)
+        if interned is None:
+            interned = ids[name] = len(table)
+            table.append(name)
+        return interned
+
+    @classmethod
+    def from_catalog(cls, source: Source) -> 'CatalogModel':
+        """Build the model from a catalog, streaming it entry by entry"""
+        return cls.from_entries(XCStringsReader(source).entries())
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[str, Dict]]) -> 'CatalogModel':
+        """Build the model from (key, entry) pairs, e.g. those of an already loaded Catalog"""
+        model = cls()
+        language_ids = model.language_ids
+        # Bits are set in growable byte rows and turned into ints once at the end
+        presence_rows = []
+        for key, entry in entries:
+            key_id = model.key_ids.get(key)
+            if key_id is None:
+                key_id = model._intern(model.keys, model.key_ids, key)
+            byte, bit = key_id >> 3, 1 << (key_id & 7)
+            for language in (entry.get('localizations') or {}):
+                language_id = language_ids.get(language)
+                if language_id is None:
+                    language_id = model._intern(model.languages, language_ids, language)
+                    presence_rows.append(bytearray())
+                _set_bit(presence_rows[language_id], byte, bit)
+        model.presence = [int.from_bytes(row, 'little') for row in presence_rows]
+        return model
+
+    # Bitset helpers
+
+    @property
+    def all_keys(self) -> int:
+        return (1 << len(self.keys)) - 1
+
+    def keys_of(self, mask: int) -> List[str]:
+        """Return the keys whose bits are set, in catalog order"""
+        bits = bin(mask)[:1:-1]
+        keys = self.keys
+        found = []
+        index = bits.find('1')
+        while index >= 0:
+            found.append(keys[index])
+            index = bits.find('1', index + 1)
+        return found
+
+    def mask_of(self, keys: Iterable[str]) -> Tuple[int, Set[str]]:
+        """Return the bitset of the given keys plus the keys this catalog does not have"""
+        key_ids = self.key_ids
+        known, unknown = [], set()
+        for key in keys:
+            key_id = key_ids.get(key)
+            if key_id is None:
+                unknown.add(key)
+            else:
+                known.append(key_id)
+        return _bitset(known, len(self.keys)), unknown
+
+    def has_language(self, language: str) -> int:
+        """Bitset of keys that have a localization for language"""
+        language_id = self.language_ids.get(language)
+        return self.presence[language_id] if language_id is not None else 0
+
+    # Bulk queries
+
+    def complete(self, languages: Iterable[str]) -> int:
+        """Bitset of keys localized in every one of languages"""
+        mask = self.all_keys
+        for language in languages:
+            mask &= self.has_language(language)
+        return mask
+
+    def missing(self, language: str) -> int:
+        """Bitset of keys without a localization for language"""
+        return self.all_keys & ~self.has_language(language)
+
+    def compare_with_code(self, code_keys: Set[str]) -> Tuple[List[str], List[str]]:
+        """Return (keys used in code but missing here, keys here that code does not use), sorted"""
+        code_mask, unknown = self.mask_of(code_keys)
+        return sorted(unknown), sorted(self.keys_of(self.all_keys & ~code_mask))
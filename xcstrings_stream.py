@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Streaming access to Localizable.xcstrings for BookletPDF App
+Parses string catalogs incrementally so memory stays flat as the catalog grows
+"""
+
+import os
+import re
+import json
+import stat
+import codecs
+import contextlib
+import tempfile
+from pathlib import Path
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+Source = Union[str, Path, BinaryIO]
+
+_WHITESPACE = ' \t\r\n'
+# Punctuation in the order Xcode's key sorting puts it, ahead of symbols, digits and letters
+_PUNCTUATION_ORDER = {char: index for index, char in enumerate("_-,;:!?.'\"()[]{}@*/\\&#%`^+<=>|~$")}
+_SORT_TOKEN = re.compile(r'\d+|\D')
+
+
+class XCStringsReader:
+    """Incremental reader for Localizable.xcstrings catalogs
+
+    Only the top-level object and the "strings" object are walked token by
+    token; each string entry is decoded on its own, so at most one entry plus
+    one read chunk is held in memory at a time. Top-level members other than
+    "strings" (sourceLanguage, version) are collected into `header` as they
+    are passed, and `member_names` records the order of all top-level members.
+    After each entry is yielded, `entry_span` holds the character offsets of
+    its `"key" : value` text in the source.
+    """
+
+    def __init__(self, source: Source, chunk_size: int = 1 << 16):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.header = {}
+        self.member_names = []
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._text_decoder = None
+        self._buf = ''
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+        self.member_start = 0
+        self.entry_span = (0, 0)
+
+    # Low-level buffer handling
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; returns False at end of input"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._buf += self._text_decoder.decode(b'', final=True)
+            self._eof = True
+            return False
+        if self._pos > self.chunk_size:
+            # Drop everything already consumed so the buffer stays around one chunk
+            self._buf = self._buf[self._pos:]
+            self._offset += self._pos
+            self._pos = 0
+        self._buf += self._text_decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it ('' at end)"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of file'!r} in {self.source}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        """Decode the next JSON value, reading more input until it is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number could continue in the next chunk
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _members(self) -> Iterator[str]:
+        """Yield the member names of the object that starts at the current position"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            self._peek()
+            self.member_start = self._offset + self._pos
+            name = self._value()
+            self._expect(':')
+            yield name
+            separator = self._peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' but found {separator or 'end of file'!r} in {self.source}")
+
+    # Public iteration API
+
+    def entries(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (key, entry) for every string in the catalog, in file order"""
+        opened = not hasattr(self.source, 'read')
+        self._file = open(self.source, 'rb') if opened else self.source
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buf, self._pos, self._offset, self._eof = '', 0, 0, False
+        self.header = {}
+        self.member_names = []
+        try:
+            for name in self._members():
+                self.member_names.append(name)
+                if name == 'strings':
+                    for key in self._members():
+                        start = self.member_start
+                        value = self._value()
+                        self.entry_span = (start, self._offset + self._pos)
+                        yield key, value
+                else:
+                    self.header[name] = self._value()
+        finally:
+            if opened:
+                self._file.close()
+
+    def records(self) -> Iterator[Tuple[str, Optional[str], Optional[Dict]]]:
+        """Yield (key, language, stringUnit) for every localization in the catalog
+
+        A key without any localization yields a single (key, None, None) record.
+        Localizations without a stringUnit (e.g. plural variations) yield None as unit.
+        """
+        for key, entry in self.entries():
+            localizations = entry.get('localizations') or {}
+            if not localizations:
+                yield key, None, None
+            for language, localization in localizations.items():
+                yield key, language, localization.get('stringUnit')
+
+
+def iter_languages_by_key(source: Source) -> Iterator[Tuple[str, set]]:
+    """Yield (key, set of languages present) by grouping the record stream"""
+    for key, records in groupby(XCStringsReader(source).records(), key=itemgetter(0)):
+        yield key, {language for _, language, _ in records if language}
+
+
+def xcode_sort_key(text: str) -> Tuple:
+    """Sort key reproducing the order Xcode writes catalog keys in
+
+    Xcode sorts like Finder: runs of digits compare by numeric value,
+    whitespace and punctuation come before digits and digits before letters,
+    and letters compare case-insensitively with lowercase first on ties.
+    """
+    primary = []
+    case = []
+    for token in _SORT_TOKEN.findall(text):
+        if token.isdigit():
+            primary.append((3, int(token)))
+        elif token.isspace():
+            primary.append((0, ord(token)))
+        elif token in _PUNCTUATION_ORDER:
+            primary.append((1, _PUNCTUATION_ORDER[token]))
+        elif token.isalpha():
+            primary.append((4, token.lower()))
+            case.append(token.isupper())
+        else:
+            primary.append((2, ord(token)))
+    return primary, case, text
+
+
+def xcode_dumps(value: Any, indent: str = '') -> str:
+    """Encode a value the way Xcode writes string catalogs
+
+    Objects get sorted keys, `" : "` separators and two-space indentation;
+    empty objects span a blank line. Strings keep non-ASCII characters and
+    do not escape slashes. indent is the indentation of the line the value
+    starts on.
+    """
+    if isinstance(value, dict):
+        if not value:
+            return '{\n\n' + indent + '}'
+        inner = indent + '  '
+        members = sorted(value.items(), key=lambda item: xcode_sort_key(item[0]))
+        return '{\n' + ',\n'.join(f'{inner}{json.dumps(name, ensure_ascii=False)} : {xcode_dumps(member, inner)}'
+                                   for name, member in members) + '\n' + indent + '}'
+    if isinstance(value, list):
+        if not value:
+            return '[\n\n' + indent + ']'
+        inner = indent + '  '
+        return '[\n' + ',\n'.join(f'{inner}{xcode_dumps(item, inner)}' for item in value) + '\n' + indent + ']'
+    return json.dumps(value, ensure_ascii=False)
+
+
+class _SplicingWriter:
+    """Assembles a catalog from new text and spans copied verbatim from the original
+
+    Nothing is written until the first change; until then only the pieces
+    (text, or (start, end) spans of the original) are remembered. Once a
+    change arrives, a temporary file next to the catalog is opened and
+    everything from then on is streamed into it.
+    """
+
+    def __init__(self, path: Path, original):
+        self.path = path
+        self.original = original
+        self.changed = False
+        self.tmp_path = None
+        self._pieces = []
+        self._out = None
+        self._source_pos = 0
+
+    def write(self, text: str):
+        if self._out:
+            self._out.write(text)
+        else:
+            self._pieces.append(text)
+
+    def copy(self, start: int, end: int):
+        if self._out:
+            self._copy(start, end)
+        else:
+            self._pieces.append((start, end))
+
+    def _copy(self, start: int, end: int, chunk_size: int = 1 << 16):
+        """Stream original characters [start, end) into the output; spans arrive in order"""
+        while self._source_pos < start:
+            self._source_pos += len(self.original.read(min(chunk_size, start - self._source_pos)))
+        while self._source_pos < end:
+            text = self.original.read(min(chunk_size, end - self._source_pos))
+            if not text:
+                raise ValueError(f"{self.path} changed while it was being updated")
+            self._out.write(text)
+            self._source_pos += len(text)
+
+    def mark_changed(self):
+        """Start writing for real, replaying the pieces collected so far"""
+        if self.changed:
+            return
+        self.changed = True
+        fd, self.tmp_path = tempfile.mkstemp(prefix=self.path.name, suffix='.tmp', dir=self.path.parent)
+        os.chmod(self.tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+        self._out = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        for piece in self._pieces:
+            if isinstance(piece, str):
+                self._out.write(piece)
+            else:
+                self._copy(*piece)
+        self._pieces = []
+
+    def commit(self):
+        """Flush the temporary file to disk and move it over the catalog"""
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        self._out.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        if self._out:
+            self._out.close()
+            os.unlink(self.tmp_path)
+
+
+def _splice_catalog(path: Path, items: Iterable[Tuple[str, Dict, Tuple[int, int], bool]], layout,
+                    additions: Optional[Dict[str, Dict]], profiler) -> int:
+    """Write (key, entry, span, changed) items plus additions over the catalog at path
+
+    layout provides member_names and header, complete by the time the first
+    item arrives (an XCStringsReader being iterated, or a loaded Catalog).
+    """
+    pending = sorted((additions or {}).items(), key=lambda item: xcode_sort_key(item[0]), reverse=True)
+    serialize = (lambda: profiler.accumulate('serialize')) if profiler else contextlib.nullcontext
+    written = []
+    count = 0
+    changes = 0
+
+    with open(path, 'r', encoding='utf-8', newline='') as original:
+        writer = _SplicingWriter(path, original)
+
+        def write_member(name: str, value_text: str):
+            writer.write(',\n  ' if written else '{\n  ')
+            writer.write(f'{json.dumps(name, ensure_ascii=False)} : {value_text}')
+            written.append(name)
+
+        def write_header(until: Optional[str] = None):
+            for name in layout.member_names:
+                if name == until:
+                    break
+                if name in layout.header and name not in written:
+                    write_member(name, xcode_dumps(layout.header[name], '  '))
+
+        def write_entry(key: Optional[str], entry: Optional[Dict], span: Optional[Tuple[int, int]] = None):
+            nonlocal count
+            if not count:
+                # Members in front of "strings" are known once its first entry arrives
+                write_header(until='strings')
+                write_member('strings', '{')
+            writer.write(',\n    ' if count else '\n    ')
+            if span:
+                writer.copy(*span)
+            else:
+                writer.mark_changed()
+                with serialize():
+                    writer.write(f'{json.dumps(key, ensure_ascii=False)} : {xcode_dumps(entry, "    ")}')
+            count += 1
+
+        try:
+            for key, entry, span, changed in items:
+                sort_key = xcode_sort_key(key)
+                while pending and xcode_sort_key(pending[-1][0]) < sort_key:
+                    write_entry(*pending.pop())
+                    changes += 1
+                if pending and pending[-1][0] == key:
+                    pending.pop()
+                if changed:
+                    write_entry(key, entry)
+                    changes += 1
+                else:
+                    write_entry(key, entry, span)
+            while pending:
+                write_entry(*pending.pop())
+                changes += 1
+            if not writer.changed:
+                return 0
+            if count:
+                writer.write('\n  }')
+            elif 'strings' in layout.member_names:
+                layout.header['strings'] = {}
+            write_header()
+            writer.write('\n}' if written else '{}')
+            writer.commit()
+        except BaseException:
+            writer.discard()
+            raise
+    return changes
+
+
+def update_catalog(path: Union[str, Path], transform: Callable[[str, Dict], Optional[Dict]],
+                   additions: Optional[Dict[str, Dict]] = None, profiler=None) -> int:
+    """Apply transform(key, entry) to every entry and write back only what changed
+
+    transform returns the replacement entry, or None to keep the entry as it
+    is. additions are new entries, inserted where Xcode's key order puts them
+    (keys already in the catalog are left alone). Unchanged entries are copied
+    character for character, changed and added ones are encoded like Xcode
+    does, so the diff only shows real edits. Entries formatted by hand (some
+    keys of the app catalog are compacted onto fewer lines) get Xcode's
+    layout on their first edit. When nothing changed the file is not touched
+    at all; otherwise a temporary file replaces it atomically.
+    Returns the number of entries changed or added. An enabled PhaseProfiler
+    gets the time spent encoding entries as 'serialize'.
+    """
+    path = Path(path)
+    reader = XCStringsReader(path)
+
+    def items():
+        for key, entry in reader.entries():
+            replacement = transform(key, entry)
+            if replacement is None:
+                yield key, entry, reader.entry_span, False
+            else:
+                yield key, replacement, None, True
+
+    return _splice_catalog(path, items(), reader, additions, profiler)
+
+
+class Catalog:
+    """A catalog parsed once and kept in memory so several steps can share it
+
+    Steps read and edit `entries` directly, calling mark_changed(key) after
+    editing an entry in place and add() for new keys. save() then writes
+    everything in one go the way update_catalog does: unchanged entries are
+    copied from the file, so the catalog must not change on disk meanwhile.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.header = {}
+        self.member_names = []
+        self.entries: Dict[str, Dict] = {}
+        self.spans: Dict[str, Tuple[int, int]] = {}
+        self.changed = set()
+        self.added: Dict[str, Dict] = {}
+        self._stamp = None
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Catalog':
+        catalog = cls(path)
+        stat_result = os.stat(catalog.path)
+        catalog._stamp = (stat_result.st_size, stat_result.st_mtime_ns)
+        reader = XCStringsReader(catalog.path)
+        for key, entry in reader.entries():
+            catalog.entries[key] = entry
+            catalog.spans[key] = reader.entry_span
+        catalog.header = reader.header
+        catalog.member_names = reader.member_names
+        return catalog
+
+    @property
+    def source_language(self) -> str:
+        return self.header.get('sourceLanguage', 'en')
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """(key, entry) for existing entries in file order, followed by added ones"""
+        yield from self.entries.items()
+        yield from self.added.items()
+
+    def mark_changed(self, key: str):
+        if key in self.entries:
+            self.changed.add(key)
+
+    def add(self, key: str, entry: Dict) -> bool:
+        """Add a new entry; returns False when the key already exists"""
+        if key in self.entries or key in self.added:
+            return False
+        self.added[key] = entry
+        return True
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.changed or self.added)
+
+    def save(self, profiler=None) -> int:
+        """Write the changed and added entries back; returns how many were written"""
+        if not self.dirty:
+            return 0
+        if self._stamp is None:
+            raise RuntimeError("A saved catalog must be loaded again before it is changed")
+        stat_result = os.stat(self.path)
+        if (stat_result.st_size, stat_result.st_mtime_ns) != self._stamp:
+            raise RuntimeError(f"{self.path} changed on disk since it was loaded")
+        items = ((key, entry, self.spans[key], key in self.changed) for key, entry in self.entries.items())
+        changes = _splice_catalog(self.path, items, self, self.added, profiler)
+        self.changed = set()
+        self.entries.update(self.added)
+        self.added = {}
+        # Spans are only valid for the file as it was loaded
+        self.spans = {}
+        self._stamp = None
+        return changes